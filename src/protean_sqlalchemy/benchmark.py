@@ -0,0 +1,95 @@
+"""Module to benchmark repositories used concurrently from many threads
+
+Threaded WSGI servers run repository calls from a pool of threads. The benchmark drives CRUD
+operations on an entity from a thread pool of increasing size, to show where throughput stops
+scaling, and checks that no connections are left checked out once the operations finish::
+
+    results = concurrency_benchmark(
+        Dog, lambda index: {'name': f'Dog {index}', 'owner': 'John', 'age': 10})
+"""
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+# Throughput of the benchmark's operations with a number of threads:
+#   * `operations`: Number of operations run, each a create, get, update and delete of an entity
+#   * `duration`: Seconds taken to run all operations
+#   * `throughput`: Operations per second
+#   * `errors`: Number of operations that raised an error, like lock timeouts
+#   * `leaked_connections`: Connections still checked out from the pool after the operations
+ThroughputResult = namedtuple(
+    'ThroughputResult', 'threads, operations, duration, throughput, errors, leaked_connections')
+
+
+class ConnectionTracker:
+    """Count connections checked out of an engine's pool and not yet returned"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.checked_out = 0
+        self._lock = threading.Lock()
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy):
+        with self._lock:
+            self.checked_out += 1
+
+    def _checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checked_out -= 1
+
+    def __enter__(self):
+        from sqlalchemy import event
+
+        event.listen(self.engine, 'checkout', self._checkout)
+        event.listen(self.engine, 'checkin', self._checkin)
+        return self
+
+    def __exit__(self, *exc_info):
+        from sqlalchemy import event
+
+        event.remove(self.engine, 'checkout', self._checkout)
+        event.remove(self.engine, 'checkin', self._checkin)
+
+
+def run_operation(entity_cls, values: dict):
+    """Create, get, update and delete an entity"""
+    entity = entity_cls.create(**values)
+    entity = entity_cls.get(getattr(entity, entity_cls.meta_.id_field.field_name))
+    entity.update(**values)
+    entity.delete()
+
+
+def concurrency_benchmark(entity_cls, values, thread_counts=(1, 2, 4, 8),
+                          operations: int = 200) -> list:
+    """Run `operations` operations on the entity with each number of threads in `thread_counts`
+
+    `values` is a function returning the field values of the entity created by the operation at
+    an index, so that entities with unique fields can be created concurrently. Returns a
+    :class:`ThroughputResult` for each number of threads.
+    """
+    from protean.core.repository import repo_factory
+
+    provider = repo_factory.get_repository(entity_cls).provider
+
+    results = []
+    for threads in thread_counts:
+        with ConnectionTracker(provider._engine) as tracker:
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                futures = [
+                    executor.submit(run_operation, entity_cls, values(index))
+                    for index in range(operations)]
+                errors = sum(1 for future in futures if future.exception() is not None)
+            duration = time.monotonic() - start
+            leaked_connections = tracker.checked_out
+
+        results.append(ThroughputResult(
+            threads=threads,
+            operations=operations,
+            duration=duration,
+            throughput=operations / duration if duration else 0.0,
+            errors=errors,
+            leaked_connections=leaked_connections))
+
+    return results
@@ -0,0 +1,211 @@
+"""Module to buffer entity inserts in memory, and write them in batches from a background thread
+
+Entities written at a high rate, like telemetry, cost a transaction each when created one at a
+time. A write buffer queues them instead, and a background thread inserts them in one
+transaction per batch once `batch_size` entities are queued, or once the oldest queued entity
+has waited `flush_interval` seconds::
+
+    buffer = WriteBuffer(provider, batch_size=500, flush_interval=1.0)
+    buffer.add(Reading(sensor='t1', value=21.5))
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from protean.core.repository import repo_factory
+
+from protean_sqlalchemy.loader import insert_rows
+from protean_sqlalchemy.loader import model_rows
+
+logger = logging.getLogger('protean_sqlalchemy.buffer')
+
+
+class WriteBufferFullError(Exception):
+    """Raised when an entity cannot be queued because the write buffer stayed full"""
+
+
+class WriteBuffer:
+    """Queue entities in memory and insert them in batched transactions
+
+    Entities are validated when they are built, but unique checks, entity hooks and change
+    capture are skipped, and values generated by the database, like auto-incremented
+    identifiers, are not set on the queued entities.
+
+    At most `max_pending` entities are queued. Adding entities to a full buffer blocks until a
+    batch has been written, or raises :class:`WriteBufferFullError` after `timeout` seconds.
+    Batches that fail to be written are dropped, and passed to the buffer's error callbacks
+    along with the error. Queued entities are written when the buffer is closed, which happens
+    at the latest when the interpreter exits.
+    """
+
+    def __init__(self, provider, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_pending: int = 10000, timeout: float = None):
+        if max_pending < batch_size:
+            raise ValueError('`max_pending` must be at least `batch_size`')
+
+        self.provider = provider
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        # Number of entities written, and dropped because their batch failed
+        self.written = 0
+        self.failed = 0
+
+        # Model classes of the entities added to the buffer
+        self._model_classes = {}
+
+        self._error_callbacks = []
+        self._closed = False
+        self._reset()
+
+    def _reset(self):
+        """Start with an empty queue and no background thread"""
+        # Queued entities, with the time they were queued
+        self._pending = deque()
+        self._condition = threading.Condition()
+
+        # Held while a batch is written, so that `flush` waits for batches being written
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self._pid = os.getpid()
+
+    def on_error(self, callback):
+        """Register a callable to receive errors raised while writing a batch
+
+        Callbacks are called from the background thread with the error and the list of entities
+        of the failed batch. Errors raised by callbacks are logged. Returns the callback, so that
+        this can be used as a decorator.
+        """
+        self._error_callbacks.append(callback)
+        return callback
+
+    def add(self, entity):
+        """Queue an entity to be inserted by the background thread"""
+        if self._closed:
+            raise RuntimeError('Entities cannot be added to a closed write buffer')
+
+        entity_cls = type(entity)
+        if entity_cls not in self._model_classes:
+            repository = repo_factory.get_repository(entity_cls)
+            if repository.provider is not self.provider:
+                raise ValueError(
+                    f'`{entity_cls.__name__}` is not stored in the write buffer\'s database')
+            self._model_classes[entity_cls] = repository.model_cls
+
+        # Entities queued in the parent process are written by the parent
+        if os.getpid() != self._pid:
+            self._reset()
+        if self._thread is None:
+            self._start()
+
+        with self._condition:
+            if not self._condition.wait_for(
+                    lambda: len(self._pending) < self.max_pending, self.timeout):
+                raise WriteBufferFullError(
+                    f'Write buffer still held {self.max_pending} entities '
+                    f'after {self.timeout} seconds')
+
+            self._pending.append((time.monotonic(), entity))
+            if len(self._pending) == 1 or len(self._pending) >= self.batch_size:
+                self._condition.notify_all()
+
+    def _start(self):
+        """Start the background thread, and write queued entities when the interpreter exits"""
+        with self._condition:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name='protean-sqlalchemy-write-buffer', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        """Write batches as they fill up or time out, until the buffer is closed"""
+        while True:
+            with self._condition:
+                while not self._closed and not self._batch_due():
+                    timeout = None
+                    if self._pending:
+                        timeout = self._pending[0][0] + self.flush_interval - time.monotonic()
+                    self._condition.wait(timeout)
+
+                if self._closed:
+                    return
+            self._write_batch()
+
+    def _batch_due(self) -> bool:
+        """Return True if a full batch is queued, or the oldest entity has waited long enough"""
+        if len(self._pending) >= self.batch_size:
+            return True
+        return bool(self._pending) and \
+            time.monotonic() - self._pending[0][0] >= self.flush_interval
+
+    def _write_batch(self) -> int:
+        """Write the next batch of queued entities, returning the number of entities taken"""
+        with self._write_lock:
+            with self._condition:
+                count = min(self.batch_size, len(self._pending))
+                batch = [self._pending.popleft()[1] for _ in range(count)]
+                self._condition.notify_all()
+
+            if batch:
+                self._write(batch)
+        return count
+
+    def _write(self, entities: list):
+        """Insert entities in one transaction, reporting errors to the error callbacks"""
+        entities_by_class = {}
+        for entity in entities:
+            entities_by_class.setdefault(type(entity), []).append(entity)
+
+        partitions = set()
+        try:
+            self.provider._check_fork()
+            with self.provider._engine.begin() as connection:
+                for entity_cls, class_entities in entities_by_class.items():
+                    model_cls = self._model_classes[entity_cls]
+                    partitions |= insert_rows(
+                        self.provider, model_cls, model_rows(model_cls, class_entities),
+                        self.batch_size, connection)
+        except Exception as exc:
+            self.failed += len(entities)
+            logger.exception(f'Unable to write a batch of {len(entities)} buffered entities')
+            for callback in list(self._error_callbacks):
+                try:
+                    callback(exc, entities)
+                except Exception:
+                    logger.exception(f'Write buffer error callback {callback!r} failed')
+        else:
+            self.written += len(entities)
+            self.provider._partitions.update(partitions)
+            self.provider.invalidate_results(*(
+                self._model_classes[entity_cls].__tablename__
+                for entity_cls in entities_by_class))
+
+    def flush(self):
+        """Write all queued entities in the calling thread, in batches of `batch_size`"""
+        if os.getpid() != self._pid:
+            self._reset()
+
+        while self._write_batch():
+            pass
+
+    def close(self):
+        """Stop the background thread and write the remaining queued entities"""
+        if self._closed:
+            return
+
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None and os.getpid() == self._pid:
+            self._thread.join()
+            atexit.unregister(self.close)
+        self.flush()
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,30 @@
+"""Module to capture changes committed through repositories, for change data capture"""
+from collections import namedtuple
+
+# A write committed through a repository:
+#   * `entity_name`: Name of the Entity class
+#   * `operation`: One of `create`, `update`, `update_all`, `delete` and `delete_all`
+#   * `identifiers`: Identifiers of the affected records
+#   * `changes`: Values written, by column. Empty for deletions.
+ChangeEvent = namedtuple('ChangeEvent', 'entity_name, operation, identifiers, changes')
+
+
+def outbox_table(name, metadata):
+    """Define the outbox table, where change events are written in the same transaction
+    as the changes themselves"""
+    from sqlalchemy import Column
+    from sqlalchemy import DateTime
+    from sqlalchemy import Integer
+    from sqlalchemy import String
+    from sqlalchemy import Table
+    from sqlalchemy import Text
+    from sqlalchemy import func
+
+    return Table(
+        name, metadata,
+        Column('id', Integer, primary_key=True),
+        Column('entity_name', String(255), nullable=False),
+        Column('operation', String(20), nullable=False),
+        Column('identifiers', Text, nullable=False),
+        Column('changes', Text, nullable=False),
+        Column('created_at', DateTime, nullable=False, server_default=func.now()))
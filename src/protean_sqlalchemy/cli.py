@@ -21,3 +21,177 @@ import click
 def main():
     """ Utility commands for the Protean Sqlalchemy package """
     pass
+
+
+@main.command()
+@click.argument('entity')
+@click.argument('source', type=click.File('r'))
+@click.option('--processes', type=int, default=None,
+              help='Number of worker processes [default: number of CPUs]')
+@click.option('--batch-size', type=int, default=1000, show_default=True,
+              help='Number of rows inserted per statement')
+@click.option('--commit-interval', type=int, default=10, show_default=True,
+              help='Number of statements between commits')
+def load(entity, source, processes, batch_size, commit_interval):
+    """ Bulk load records from a JSON lines file (or - for stdin) into an entity's table
+
+    ENTITY is the dotted path of the Entity class, like `app.entities.Dog`. Protean settings
+    are read from the module named by the PROTEAN_CONFIG environment variable.
+    """
+    import json
+
+    from protean.utils.importlib import perform_import
+
+    from protean_sqlalchemy.loader import bulk_load
+    from protean_sqlalchemy.loader import register_entity
+
+    entity_cls = perform_import(entity)
+    register_entity(entity_cls)
+
+    records = (json.loads(line) for line in source if line.strip())
+    loaded = bulk_load(
+        entity_cls, records, processes=processes, batch_size=batch_size,
+        commit_interval=commit_interval)
+    click.echo(f'Loaded {loaded} records into {entity_cls.__name__}')
+
+
+@main.command()
+@click.argument('entity')
+@click.option('--values', 'values_json', required=True,
+              help='JSON object of field values. `{index}` in string values is replaced by the '
+                   'index of the entity, for unique fields.')
+@click.option('--operations', type=int, default=200, show_default=True,
+              help='Number of create, get, update and delete operations per run')
+@click.option('--threads', default='1,2,4,8', show_default=True,
+              help='Comma separated numbers of threads to run the operations with')
+@click.option('--memory', is_flag=True,
+              help='Also profile memory allocated by creating, loading and deleting entities')
+@click.option('--count', type=int, default=1000, show_default=True,
+              help='Number of entities created by the memory profile')
+def bench(entity, values_json, operations, threads, memory, count):
+    """ Benchmark CRUD operations and filters on an entity's table
+
+    ENTITY is the dotted path of the Entity class, like `app.entities.Dog`. Entities are
+    created in, and deleted from, the configured database.
+    """
+    import json
+
+    from protean.utils.importlib import perform_import
+
+    from protean_sqlalchemy.benchmark import concurrency_benchmark
+    from protean_sqlalchemy.loader import register_entity
+    from protean_sqlalchemy.profiling import memory_benchmark
+
+    entity_cls = perform_import(entity)
+    register_entity(entity_cls)
+
+    template = json.loads(values_json)
+
+    def values(index):
+        return {
+            name: value.format(index=index) if isinstance(value, str) else value
+            for name, value in template.items()}
+
+    thread_counts = [int(number) for number in threads.split(',')]
+    for result in concurrency_benchmark(entity_cls, values, thread_counts, operations):
+        click.echo(
+            f'{result.threads} threads: {result.operations} operations in '
+            f'{result.duration:.3f}s ({result.throughput:.1f}/s), {result.errors} errors, '
+            f'{result.leaked_connections} leaked connections')
+
+    if memory:
+        for stats in memory_benchmark(entity_cls, values, count):
+            click.echo(
+                f'{stats.method}: {stats.calls} calls, peak {stats.peak} bytes, '
+                f'retained {stats.retained} bytes')
+
+
+@main.command()
+@click.argument('entity')
+@click.argument('criteria')
+@click.option('--limit', type=int, default=10, show_default=True,
+              help='Maximum number of entities to query for')
+@click.option('--order-by', multiple=True,
+              help='Field to order results by, prefixed with - for descending order')
+def explain(entity, criteria, limit, order_by):
+    """ Print the SQL and query plan of a filter on an entity's table
+
+    ENTITY is the dotted path of the Entity class, and CRITERIA a JSON object of filters, like
+    `{"owner": "John", "age__gte": 5}`.
+    """
+    import json
+
+    from protean.core.repository import repo_factory
+    from protean.utils.importlib import perform_import
+    from protean.utils.query import Q
+
+    from protean_sqlalchemy.loader import register_entity
+
+    entity_cls = perform_import(entity)
+    register_entity(entity_cls)
+
+    repository = repo_factory.get_repository(entity_cls)
+    try:
+        filters = json.loads(criteria)
+    except ValueError as exc:
+        raise click.BadParameter(f'Not a valid JSON object: {exc}', param_hint='CRITERIA')
+    if not isinstance(filters, dict):
+        raise click.BadParameter('Not a JSON object of filters', param_hint='CRITERIA')
+
+    # Unknown fields and lookups would otherwise fail deep in the repository
+    field_names = entity_cls.meta_.attributes
+    for key in filters:
+        try:
+            field_name, _ = repository.provider._extract_lookup(key)
+        except NotImplementedError:
+            raise click.BadParameter(f'Unknown lookup in `{key}`', param_hint='CRITERIA')
+        if field_name not in field_names:
+            raise click.BadParameter(
+                f'`{entity_cls.__name__}` has no field `{field_name}`', param_hint='CRITERIA')
+    for order_col in order_by:
+        if order_col.lstrip('-') not in field_names:
+            raise click.BadParameter(
+                f'`{entity_cls.__name__}` has no field `{order_col.lstrip("-")}`',
+                param_hint='--order-by')
+
+    query_plans = repository.provider.query_plans
+
+    # Plans are kept in a bounded deque, whose length stops growing once it is full, so check
+    #   for a new plan by identity
+    previous = query_plans[-1] if query_plans else None
+    repository.filter(Q(**filters), limit=limit, order_by=list(order_by), explain=True)
+
+    # Errors running EXPLAIN are logged by the repository, which then captures no plan
+    if not query_plans or query_plans[-1] is previous:
+        raise click.ClickException('Unable to capture the query plan, see the logs for details')
+    query_plan = query_plans[-1]
+    click.echo(query_plan.statement)
+    click.echo()
+    for line in query_plan.plan:
+        click.echo(line)
+    if query_plan.full_scan:
+        click.echo('Warning: the query scans the full table')
+
+
+@main.command()
+@click.option('--provider', 'provider_names', multiple=True,
+              help='Name of the database to report on [default: all databases]')
+def stats(provider_names):
+    """ Report table sizes, row counts, index usage and connection pools of databases """
+    from protean.core.provider import providers
+    from protean.conf import active_config
+
+    from protean_sqlalchemy.stats import pool_status
+    from protean_sqlalchemy.stats import table_stats
+
+    def size(value):
+        return 'unknown size' if value is None else f'{value} bytes'
+
+    for provider_name in provider_names or active_config.DATABASES:
+        provider = providers.get_provider(provider_name)
+        click.echo(f'{provider_name}: {pool_status(provider)}')
+        for table in table_stats(provider):
+            click.echo(f'  {table.name}: {table.rows} rows, {size(table.size)}')
+            for index in table.indexes:
+                scans = '' if index.scans is None else f', {index.scans} scans'
+                click.echo(f'    {index.name}: {size(index.size)}{scans}')
@@ -0,0 +1,136 @@
+"""Module with custom column types, for compact storage of field values"""
+import lzma
+import pickle
+import uuid
+import zlib
+
+from sqlalchemy import types as sa_types
+from sqlalchemy.dialects import postgresql
+
+# Bounds of integer column types, used to pick the narrowest type holding a field's values
+SMALLINT_RANGE = (-2 ** 15, 2 ** 15 - 1)
+INTEGER_RANGE = (-2 ** 31, 2 ** 31 - 1)
+
+
+class GUID(sa_types.TypeDecorator):
+    """UUID stored in 16 bytes, instead of 36 characters
+
+    Postgres stores values in its native `UUID` type, and other databases in a 16 byte binary
+    column. Values are read and written as strings.
+    """
+    impl = sa_types.BINARY(16)
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID())
+        return dialect.type_descriptor(sa_types.BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+
+        value = value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+        if dialect.name == 'postgresql':
+            return str(value)
+        return value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+
+        if dialect.name == 'postgresql':
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
+
+
+def integer_type(min_value=None, max_value=None):
+    """Return the narrowest integer type holding values between the bounds
+
+    Unbounded fields get a regular `Integer`, as do fields whose bounds exceed the range of
+    `SmallInteger` but not that of `Integer`.
+    """
+    if min_value is None or max_value is None:
+        bounds_exceed_integer = (
+            (min_value is not None and min_value < INTEGER_RANGE[0]) or
+            (max_value is not None and max_value > INTEGER_RANGE[1]))
+        return sa_types.BigInteger if bounds_exceed_integer else sa_types.Integer
+
+    if SMALLINT_RANGE[0] <= min_value and max_value <= SMALLINT_RANGE[1]:
+        return sa_types.SmallInteger
+    if INTEGER_RANGE[0] <= min_value and max_value <= INTEGER_RANGE[1]:
+        return sa_types.Integer
+    return sa_types.BigInteger
+
+
+# Codecs compressing column values, by name: the tag stored as the first byte of compressed
+#   values, along with the compress and decompress functions
+CODECS = {
+    'zlib': (b'z', zlib.compress, zlib.decompress),
+    'lzma': (b'x', lzma.compress, lzma.decompress),
+}
+
+# Tag of values stored uncompressed
+UNCOMPRESSED = b'\x00'
+
+
+def register_codec(name: str, tag: bytes, compress, decompress):
+    """Make a compression codec available to compressed columns
+
+    `tag` is a single byte stored with each compressed value, to pick the codec that
+    decompresses it, so tags must never be reused for another codec.
+    """
+    if len(tag) != 1 or tag == UNCOMPRESSED:
+        raise ValueError('Codec tags must be a single byte, other than a null byte')
+    if any(existing_tag == tag for existing_tag, _, _ in CODECS.values()):
+        raise ValueError(f'Codec tag {tag!r} is already in use')
+    CODECS[name] = (tag, compress, decompress)
+
+
+class Compressed(sa_types.TypeDecorator):
+    """Text, or pickled values, stored compressed in a binary column
+
+    Values shorter than `threshold` bytes are stored uncompressed, as compressing them saves
+    little. Each value is tagged with the codec that compressed it, so values remain readable
+    when the codec of a column is changed.
+    """
+    impl = sa_types.LargeBinary
+
+    def __init__(self, pickled: bool = False, codec: str = 'zlib', threshold: int = 256):
+        if codec not in CODECS:
+            raise ValueError(f'Unknown compression codec `{codec}`')
+
+        super().__init__()
+        self.pickled = pickled
+        self.codec = codec
+        self.threshold = threshold
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+
+        if self.pickled:
+            data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        else:
+            data = value.encode('utf-8')
+
+        if len(data) < self.threshold:
+            return UNCOMPRESSED + data
+
+        tag, compress, _ = CODECS[self.codec]
+        return tag + compress(data)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+
+        value = bytes(value)
+        tag, data = value[:1], value[1:]
+        if tag != UNCOMPRESSED:
+            decompressors = {codec_tag: decompress for codec_tag, _, decompress in CODECS.values()}
+            if tag not in decompressors:
+                raise ValueError(f'Unknown compression codec tag {tag!r}, register its codec')
+            data = decompressors[tag](data)
+
+        if self.pickled:
+            return pickle.loads(data)
+        return data.decode('utf-8')
@@ -0,0 +1,53 @@
+"""Module to capture query plans of statements with the database's EXPLAIN command"""
+from collections import namedtuple
+
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement
+from sqlalchemy.sql.expression import Executable
+
+# A query plan captured for a repository call, along with the criteria and duration of the call
+QueryPlan = namedtuple(
+    'QueryPlan',
+    'entity_name, criteria, duration, statement, plan, full_scan')
+
+# EXPLAIN commands per dialect. Dialects not listed here use a plain `EXPLAIN`.
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN',
+    'postgresql': 'EXPLAIN (ANALYZE, BUFFERS)',
+}
+
+
+class Explain(Executable, ClauseElement):
+    """Statement that explains the query plan of another statement"""
+
+    def __init__(self, statement, prefix):
+        self.statement = statement
+        self.prefix = prefix
+
+
+@compiles(Explain)
+def visit_explain(element, compiler, **kwargs):
+    """Compile the explained statement, prefixed with the EXPLAIN command"""
+    return f'{element.prefix} {compiler.process(element.statement, **kwargs)}'
+
+
+def explain(conn, statement, dialect):
+    """Run EXPLAIN on the statement and return the lines of its query plan
+
+    The plan is also checked for full table scans, which return ``True`` as the second value.
+    """
+    prefix = EXPLAIN_PREFIXES.get(dialect.name, 'EXPLAIN')
+    rows = conn.execute(Explain(statement, prefix)).fetchall()
+
+    if dialect.name == 'sqlite':
+        # Rows are (id, parent, notused, detail), with details like `SCAN dog` for full scans,
+        #   and `SEARCH dog USING INTEGER PRIMARY KEY (rowid=?)` or
+        #   `SCAN dog USING COVERING INDEX ...` when an index is used
+        plan = [row[-1] for row in rows]
+        full_scan = any(
+            line.startswith('SCAN') and 'INDEX' not in line for line in plan)
+    else:
+        plan = [' '.join(str(column) for column in row) for row in rows]
+        full_scan = any('Seq Scan' in line or 'ALL' in line.split() for line in plan)
+
+    return plan, full_scan
@@ -0,0 +1,145 @@
+"""Module to bulk load large numbers of entities with a pool of processes
+
+Converting records to entities and rows is CPU-bound, so a single process cannot keep the
+database busy. The loader splits the records into chunks, and worker processes convert each
+chunk and insert it over connections of their own::
+
+    loaded = bulk_load(Dog, records, processes=8, batch_size=1000, commit_interval=10)
+"""
+import os
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import wait
+from itertools import islice
+
+from protean.core.repository import repo_factory
+from protean.utils.generic import fully_qualified_name
+
+from protean_sqlalchemy.partition import partition_options
+
+
+def register_entity(entity_cls):
+    """Register an entity with the repository factory, unless it is registered already"""
+    if fully_qualified_name(entity_cls) not in repo_factory._registry:
+        repo_factory.register(entity_cls)
+
+
+def model_rows(model_cls, entities) -> list:
+    """Convert entities to rows of the model's table
+
+    Values of auto fields that have not been assigned are left out of the rows, so that the
+    database generates them.
+    """
+    table = model_cls.__table__
+    auto_fields = {field_name for field_name, _ in model_cls.entity_cls.meta_.auto_fields}
+
+    rows = []
+    for entity in entities:
+        model_obj = model_cls.from_entity(entity)
+        row = {column.name: getattr(model_obj, column.key) for column in table.columns}
+        for field_name in auto_fields:
+            if row.get(field_name) is None:
+                row.pop(field_name, None)
+        rows.append(row)
+    return rows
+
+
+def insert_rows(provider, model_cls, rows: list, batch_size: int, connection) -> set:
+    """Insert rows into the model's table on `connection`, `batch_size` rows per statement
+
+    Partitions holding the rows are created first, for partitioned entities. Returns the names
+    of the partitions created, to be recorded on the provider once the transaction commits.
+    """
+    table = model_cls.__table__
+
+    # Rows sent in one `executemany` must all have the same columns
+    rows_by_columns = {}
+    for row in rows:
+        rows_by_columns.setdefault(tuple(row), []).append(row)
+
+    partitions = set()
+    partitioning = partition_options(model_cls.entity_cls)
+    if partitioning is not None:
+        for row in rows:
+            provider.create_partition(
+                model_cls.entity_cls, row[partitioning.field_name], connection, partitions)
+
+    for column_rows in rows_by_columns.values():
+        for index in range(0, len(column_rows), batch_size):
+            connection.execute(table.insert(), column_rows[index:index + batch_size])
+
+    return partitions
+
+
+def load_chunk(entity_cls, records: list, batch_size: int) -> int:
+    """Convert records to rows and insert them in batches of `batch_size`, in one transaction
+
+    Records are validated by building entities from them, but unique checks and the entity's
+    `pre_save` and `post_save` hooks are skipped. Returns the number of rows inserted.
+    """
+    repository = repo_factory.get_repository(entity_cls)
+    provider, model_cls = repository.provider, repository.model_cls
+    rows = model_rows(model_cls, (entity_cls(**record) for record in records))
+
+    provider._check_fork()
+    with provider._engine.begin() as connection:
+        partitions = insert_rows(provider, model_cls, rows, batch_size, connection)
+    provider._partitions.update(partitions)
+    provider.invalidate_results(model_cls.__tablename__)
+
+    return len(rows)
+
+
+def chunked(records, size: int):
+    """Split an iterable into lists of `size` items, without reading it all into memory"""
+    iterator = iter(records)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_load(entity_cls, records, processes: int = None, batch_size: int = 1000,
+              commit_interval: int = 10) -> int:
+    """Insert records (dictionaries of field values) as rows of the entity's table
+
+    Records are inserted `batch_size` rows per statement, with a commit every `commit_interval`
+    statements. Each chunk of `batch_size * commit_interval` records is converted and inserted by
+    one of `processes` worker processes (defaulting to the number of CPUs), or in this process
+    when `processes` is 1. Records are read from the iterable as workers become free, so
+    arbitrarily large inputs can be loaded.
+
+    Chunks are committed independently, so chunks committed before an error remain loaded. The
+    bulk load bypasses repositories: unique checks, entity hooks, the record cache and change
+    capture are skipped. Returns the number of rows inserted.
+    """
+    chunk_size = batch_size * commit_interval
+    if processes == 1:
+        return sum(
+            load_chunk(entity_cls, chunk, batch_size)
+            for chunk in chunked(records, chunk_size))
+
+    # Imported here, as the process pool pulls in `multiprocessing`
+    from concurrent.futures import ProcessPoolExecutor
+
+    processes = processes or os.cpu_count() or 1
+    loaded = 0
+    with ProcessPoolExecutor(
+            max_workers=processes, initializer=register_entity,
+            initargs=(entity_cls,)) as executor:
+        # Keep a couple of chunks queued per worker, rather than reading the whole input
+        max_pending = 2 * processes
+        pending = set()
+        for chunk in chunked(records, chunk_size):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                loaded += sum(future.result() for future in done)
+            pending.add(executor.submit(load_chunk, entity_cls, chunk, batch_size))
+
+        loaded += sum(future.result() for future in pending)
+
+    # Results cached by this process were invalidated in the workers' processes only
+    repository = repo_factory.get_repository(entity_cls)
+    repository.provider.invalidate_results(repository.model_cls.__tablename__)
+
+    return loaded
@@ -0,0 +1,76 @@
+"""Module to walk query results page by page, with keyset pagination and prefetching
+
+Offset pagination reads and discards all the rows before each page, so walking a large result
+gets slower with every page. Keyset pagination starts each page after the last row of the
+previous one instead, on the columns the results are ordered by. Pages are fetched ahead by a
+background thread while the caller processes the current page::
+
+    for page in repository.iter_pages(Q(owner='John'), page_size=1000, prefetch=2):
+        export(page)
+"""
+import queue
+import threading
+
+# Marker put on the queue of prefetched items once the iterable is exhausted
+_DONE = object()
+
+
+def keyset_condition(keys: list, row):
+    """Return the condition matching rows ordered after `row`
+
+    `keys` lists the columns the rows are ordered by, with True for descending columns. The
+    last column must be unique, so that the order is total. Columns must not hold NULL values.
+    """
+    from sqlalchemy import and_
+    from sqlalchemy import or_
+
+    clauses = []
+    for index, (column, descending) in enumerate(keys):
+        equal = [previous == row[previous] for previous, _ in keys[:index]]
+        after = column < row[column] if descending else column > row[column]
+        clauses.append(and_(*equal, after))
+    return or_(*clauses)
+
+
+def prefetched(iterable, depth: int):
+    """Iterate over an iterable, while a background thread reads up to `depth` items ahead
+
+    Errors raised by the iterable are raised by the iterator when it reaches them. Closing the
+    iterator, or abandoning it, stops the background thread.
+    """
+    items = queue.Queue(maxsize=depth)
+    stopped = threading.Event()
+
+    def put(item, error=None):
+        """Queue an item, unless the consumer stops first. Returns True if it was queued."""
+        while not stopped.is_set():
+            try:
+                items.put((item, error), timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in iterable:
+                if not put(item):
+                    return
+        except Exception as exc:
+            put(_DONE, exc)
+        else:
+            put(_DONE)
+
+    thread = threading.Thread(target=produce, name='protean-sqlalchemy-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = items.get()
+            if item is _DONE:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stopped.set()
+        thread.join()
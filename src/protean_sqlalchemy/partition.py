@@ -0,0 +1,91 @@
+"""Module to manage time-partitioned tables of high-volume entities
+
+An entity is partitioned by declaring the date or datetime field to partition on, and optionally
+the length of each partition, in its ``Meta`` options::
+
+    class AuditLog(Entity):
+        message = field.Text()
+        created_at = field.DateTime(default=datetime.utcnow)
+
+        class Meta:
+            partition_by = 'created_at'
+            partition_interval = 'month'
+"""
+from collections import namedtuple
+from datetime import date
+from datetime import datetime
+
+from protean.core import field
+from protean.core.exceptions import ConfigurationError
+
+# Partitioning options of an entity
+PartitionOptions = namedtuple('PartitionOptions', 'field_name, interval')
+
+# Supported lengths of partitions, along with the format of their names
+INTERVAL_FORMATS = {
+    'day': '%Y%m%d',
+    'month': '%Y%m',
+    'year': '%Y',
+}
+
+
+def partition_options(entity_cls):
+    """Return the partitioning options of an entity, or None if it is not partitioned"""
+    meta = getattr(entity_cls, 'Meta', None)
+    field_name = getattr(meta, 'partition_by', None)
+    if field_name is None:
+        return None
+
+    interval = getattr(meta, 'partition_interval', 'month')
+    if interval not in INTERVAL_FORMATS:
+        raise ConfigurationError(
+            f'`{entity_cls.__name__}` has an unknown partition interval `{interval}`. '
+            f'Choose one of {", ".join(INTERVAL_FORMATS)}')
+
+    field_obj = entity_cls.meta_.declared_fields.get(field_name)
+    if not isinstance(field_obj, (field.Date, field.DateTime)):
+        raise ConfigurationError(
+            f'`{entity_cls.__name__}` can only be partitioned by a Date or DateTime field')
+
+    return PartitionOptions(field_name=field_name, interval=interval)
+
+
+def period_start(value, interval: str) -> date:
+    """Return the first day of the period containing a date or datetime"""
+    if isinstance(value, datetime):
+        value = value.date()
+
+    if interval == 'year':
+        return value.replace(month=1, day=1)
+    elif interval == 'month':
+        return value.replace(day=1)
+    return value
+
+
+def period_end(start: date, interval: str) -> date:
+    """Return the first day after the period starting on `start`"""
+    if interval == 'year':
+        return start.replace(year=start.year + 1)
+    elif interval == 'month':
+        if start.month == 12:
+            return start.replace(year=start.year + 1, month=1)
+        return start.replace(month=start.month + 1)
+    return date.fromordinal(start.toordinal() + 1)
+
+
+def partition_name(table_name: str, start: date, interval: str) -> str:
+    """Return the name of the partition table for the period starting on `start`"""
+    return f'{table_name}_p{start.strftime(INTERVAL_FORMATS[interval])}'
+
+
+def partition_start(table_name: str, name: str, interval: str):
+    """Return the start of the period held by a partition table, or None if the table is not
+    a partition of `table_name`"""
+    prefix = f'{table_name}_p'
+    if not name.startswith(prefix):
+        return None
+
+    try:
+        return datetime.strptime(name[len(prefix):], INTERVAL_FORMATS[interval]).date()
+    except ValueError:
+        return None
@@ -0,0 +1,126 @@
+"""Module to profile memory allocated by repository operations with :mod:`tracemalloc`
+
+Profiling is opt-in, as tracing allocations slows down the interpreter considerably::
+
+    with provider.profile_memory() as profiler:
+        Dog.query.filter(owner='John').all()
+
+    for stats in profiler.report():
+        print(stats)
+"""
+import tracemalloc
+from collections import namedtuple
+from functools import wraps
+
+# Memory allocated by calls to a repository method for an entity:
+#   * `calls`: Number of calls profiled
+#   * `peak`: Largest peak of memory allocated during a call, in bytes
+#   * `retained`: Total memory still allocated after the calls returned, in bytes
+MemoryStats = namedtuple('MemoryStats', 'entity_name, method, calls, peak, retained')
+
+
+class MemoryProfiler:
+    """Collect peak and retained memory of repository calls, by entity and method
+
+    Memory is traced for the whole process, so profiles are only meaningful when the profiled
+    calls are not run concurrently with other work. On Python versions before 3.9, peaks cannot be
+    reset between calls, and the peak of each call is the peak since profiling started.
+    """
+
+    def __init__(self):
+        self._stats = {}
+        self._depth = 0
+        self._started_tracing = False
+
+    def start(self):
+        """Start tracing allocations, unless they are already being traced"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stop tracing allocations, if tracing was started by this profiler"""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def call(self, entity_name: str, method: str, func, *args, **kwargs):
+        """Call a function, and record the memory it allocates against the entity and method
+
+        Calls made within a profiled call are attributed to the outer call.
+        """
+        if self._depth or not tracemalloc.is_tracing():
+            return func(*args, **kwargs)
+
+        reset_peak = getattr(tracemalloc, 'reset_peak', None)
+        if reset_peak is not None:
+            reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+
+        self._depth += 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            self._depth -= 1
+            after, peak = tracemalloc.get_traced_memory()
+            self.record(entity_name, method, max(peak - before, 0), after - before)
+
+    def record(self, entity_name: str, method: str, peak: int, retained: int):
+        """Add the memory allocated by a call to the statistics of the entity and method"""
+        key = (entity_name, method)
+        stats = self._stats.get(key, MemoryStats(entity_name, method, 0, 0, 0))
+        self._stats[key] = stats._replace(
+            calls=stats.calls + 1,
+            peak=max(stats.peak, peak),
+            retained=stats.retained + retained)
+
+    def report(self) -> list:
+        """Return the statistics of each entity and method, largest peaks first"""
+        return sorted(self._stats.values(), key=lambda stats: stats.peak, reverse=True)
+
+    def reset(self):
+        """Discard the statistics collected so far"""
+        self._stats = {}
+
+
+def profiled(method):
+    """Decorate a repository method to profile its memory when the provider is profiling"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.provider.memory_profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        return profiler.call(
+            self.entity_cls.__name__, method.__name__, method, self, *args, **kwargs)
+    return wrapper
+
+
+def memory_benchmark(entity_cls, values, count: int = 1000) -> list:
+    """Profile creating, loading and deleting `count` entities built from `values`
+
+    `values` is a dictionary of field values, or a function returning the field values of the
+    entity at an index, for entities with unique fields. Only the entities created by the
+    benchmark are loaded and deleted.
+    """
+    from protean.core.repository import repo_factory
+    from protean.utils.query import Q
+
+    repository = repo_factory.get_repository(entity_cls)
+    id_field_name = entity_cls.meta_.id_field.field_name
+    with repository.provider.profile_memory() as profiler:
+        identifiers = [
+            getattr(entity_cls.create(**(values(index) if callable(values) else values)),
+                    id_field_name)
+            for index in range(count)]
+        criteria = Q(**{f'{id_field_name}__in': identifiers})
+        entity_cls.query.filter(criteria).limit(count).all()
+        repository.delete_all(criteria)
+
+    return profiler.report()
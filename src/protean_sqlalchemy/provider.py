@@ -1,39 +1,295 @@
 """This module holds the Provider Implementation for SQLAlchemy"""
+import json
+import logging
+import os
+import re
+import threading
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
 from typing import Any
 
+from protean.core import field
+from protean.core.exceptions import ConfigurationError
 from protean.core.provider.base import BaseProvider
 from protean.core.repository import BaseLookup
-from sqlalchemy import MetaData
-from sqlalchemy import create_engine
-from sqlalchemy import orm
-from sqlalchemy.engine.url import make_url
+from protean.utils.importlib import perform_import
+
+from protean_sqlalchemy.changes import outbox_table
+from protean_sqlalchemy.partition import partition_name
+from protean_sqlalchemy.partition import partition_options
+from protean_sqlalchemy.partition import partition_start
+from protean_sqlalchemy.partition import period_end
+from protean_sqlalchemy.partition import period_start
+from protean_sqlalchemy.profiling import MemoryProfiler
+from protean_sqlalchemy.result_cache import ResultCache
+from protean_sqlalchemy.search import search_expression
+from protean_sqlalchemy.search import search_options
+
+# Pragma presets that can be selected for SQLite databases with the ``SQLITE_PROFILE`` key
+#   in the provider's connection info. Individual pragmas can be added or overridden with
+#   the ``SQLITE_PRAGMAS`` dictionary.
+SQLITE_PROFILES = {
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+    'fast': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'read_only': {
+        'query_only': 'ON',
+        'cache_size': -64000,
+        'mmap_size': 1073741824,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+}
 
-from protean_sqlalchemy.repository import SARepository
-from protean_sqlalchemy.repository import SqlalchemyModel
+logger = logging.getLogger('protean_sqlalchemy.provider')
 
 
 class SAProvider(BaseProvider):
-    """Provider Implementation class for SQLAlchemy"""
+    """Provider Implementation class for SQLAlchemy
+
+    SQLAlchemy (engine, ORM and dialect modules) is imported lazily when the first provider is
+    instantiated, so that merely importing this module stays cheap for CLI invocations and
+    short-lived processes that never talk to the database.
+    """
 
     def __init__(self, *args, **kwargs):
         """Initialize and maintain Engine"""
         super().__init__(*args, **kwargs)
 
-        self._engine = create_engine(make_url(self.conn_info['DATABASE_URI']))
+        from sqlalchemy import MetaData
+        from sqlalchemy import create_engine
+        from sqlalchemy import orm
+        from sqlalchemy.engine.url import make_url
+
+        url = make_url(self.conn_info['DATABASE_URI'])
+
+        # In-memory SQLite databases are shared by all connections of the provider, and kept
+        #   alive by a connection of the provider's own
+        self._memory_database = None
+        self._snapshot = None
+        if url.drivername.startswith('sqlite') and url.database in (None, '', ':memory:'):
+            self._engine = self._create_memory_engine(url)
+        else:
+            self._engine = create_engine(url)
         self._metadata = MetaData(bind=self._engine)
 
+        # Objects are not expired on commit, as reading their attributes afterwards would
+        #   start a new transaction on a session that Protean never closes
+        self._session_factory = orm.sessionmaker(bind=self._engine, expire_on_commit=False)
+
+        if self._engine.dialect.name == 'sqlite':
+            self._configure_sqlite()
+        self._configure_fork_safety()
+
         self._model_classes = {}
 
+        # Optional cache of entity records, configured like Protean's `CACHE` setting
+        self.cache = None
+        cache_config = self.conn_info.get('CACHE')
+        if cache_config:
+            self.cache = perform_import(cache_config['PROVIDER'])(cache_config)
+
+        # Optional cache of `filter` results, invalidated by writes to their table
+        self.result_cache = None
+        result_cache_config = self.conn_info.get('RESULT_CACHE')
+        if result_cache_config:
+            self.result_cache = ResultCache(
+                max_size=result_cache_config.get('MAX_SIZE', 16 * 1024 * 1024))
+
+        # Subscribers to changes committed through repositories, and the optional outbox table
+        #   where changes are written in the same transaction
+        self._change_subscribers = []
+        self.outbox = None
+        if self.conn_info.get('CHANGE_OUTBOX'):
+            self.outbox = outbox_table(self.conn_info['CHANGE_OUTBOX'], self._metadata)
+
+        # Optional buffer of entities inserted in batches by a background thread
+        self.write_buffer = None
+        buffer_config = self.conn_info.get('WRITE_BUFFER')
+        if buffer_config:
+            from protean_sqlalchemy.buffer import WriteBuffer
+
+            self.write_buffer = WriteBuffer(
+                self,
+                batch_size=buffer_config.get('BATCH_SIZE', 500),
+                flush_interval=buffer_config.get('FLUSH_INTERVAL', 1.0),
+                max_pending=buffer_config.get('MAX_PENDING', 10000),
+                timeout=buffer_config.get('TIMEOUT'))
+
+        # Profiler of memory allocated by repository calls, when memory is being profiled
+        self.memory_profiler = None
+        if self.conn_info.get('PROFILE_MEMORY'):
+            self.memory_profiler = MemoryProfiler()
+            self.memory_profiler.start()
+
+        # Most recent query plans captured by repositories
+        self.query_plans = deque(maxlen=self.conn_info.get('EXPLAIN_HISTORY', 100))
+
+        # Sessions of the transactions active in each thread, innermost last
+        self._transactions = threading.local()
+
+        # Process that owns the engine's connection pool, and pools inherited from parent
+        #   processes. Inherited pools are never used, but are referenced so that their
+        #   connections are not garbage collected (and closed) under the parent's feet.
+        self._pid = os.getpid()
+        self._inherited_pools = []
+
+        # Names of table partitions known to exist
+        self._partitions = set()
+
+    def _create_memory_engine(self, url):
+        """Create an engine on a shared-cache in-memory SQLite database, private to the
+        provider"""
+        import sqlite3
+
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+
+        database = f'file:protean-{self.identifier}?mode=memory&cache=shared'
+
+        def connect():
+            return sqlite3.connect(database, uri=True, check_same_thread=False)
+
+        self._memory_database = connect()
+        return create_engine(url, creator=connect, poolclass=NullPool)
+
+    def snapshot(self):
+        """Take a snapshot of the in-memory database, to restore it later
+
+        Typically taken once the schema has been created, so that the database can be reset
+        between tests with `restore()` instead of recreating the schema or deleting records.
+        """
+        import sqlite3
+
+        if self._memory_database is None:
+            raise ConfigurationError('Snapshots are only supported on in-memory SQLite databases')
+        if not hasattr(sqlite3.Connection, 'backup'):
+            raise ConfigurationError('Snapshots require SQLite\'s backup API, from Python 3.7')
+
+        snapshot = sqlite3.connect(':memory:', check_same_thread=False)
+        self._memory_database.backup(snapshot)
+        self._snapshot = snapshot
+
+    def restore(self):
+        """Restore the in-memory database to its last snapshot, with SQLite's backup API
+
+        Connections of the provider must not be in a transaction while the database is restored.
+        The provider's caches, if any, are cleared as well.
+        """
+        if self._snapshot is None:
+            raise ConfigurationError('No snapshot of the database has been taken')
+
+        self._snapshot.backup(self._memory_database)
+        if self.cache is not None:
+            self.cache.clear()
+        if self.result_cache is not None:
+            self.result_cache.clear()
+
+    def _sqlite_pragmas(self):
+        """Return the pragmas configured for a SQLite database in the connection info"""
+        profile = self.conn_info.get('SQLITE_PROFILE')
+        if profile is not None and profile not in SQLITE_PROFILES:
+            raise ConfigurationError(
+                f'Unknown SQLite profile `{profile}`. '
+                f'Choose one of {", ".join(sorted(SQLITE_PROFILES))}')
+
+        pragmas = dict(SQLITE_PROFILES.get(profile, {}))
+        pragmas.update(self.conn_info.get('SQLITE_PRAGMAS', {}))
+
+        # Pragma statements do not support bound parameters, so restrict both names and
+        #   values to plain words and numbers before interpolating them into the statement
+        for name, value in pragmas.items():
+            if not re.fullmatch(r'\w+', name) or not re.fullmatch(r'-?\w+', str(value)):
+                raise ConfigurationError(f'Invalid SQLite pragma `{name}={value}`')
+
+        return pragmas
+
+    def _configure_sqlite(self):
+        """Apply configured pragmas on every new connection to the SQLite database, and begin
+        transactions explicitly"""
+        from sqlalchemy import event
+
+        pragmas = self._sqlite_pragmas()
+
+        def configure_connection(dbapi_connection, connection_record):
+            # pysqlite only begins a transaction before the first write, so a savepoint taken
+            #   earlier would start the transaction, and releasing it would commit. Disable
+            #   pysqlite's transaction handling, and begin transactions from the `begin` event.
+            dbapi_connection.isolation_level = None
+
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+            cursor.close()
+
+        def begin(connection):
+            # Begin on the DBAPI connection, so that statement events only see the block's own
+            #   statements
+            connection.connection.execute('BEGIN')
+
+        event.listen(self._engine, 'connect', configure_connection)
+        event.listen(self._engine, 'begin', begin)
+
+    def _configure_fork_safety(self):
+        """Refuse to check out pooled connections that were opened by another process"""
+        from sqlalchemy import event
+        from sqlalchemy import exc
+
+        def record_pid(dbapi_connection, connection_record):
+            connection_record.info['pid'] = os.getpid()
+
+        def check_pid(dbapi_connection, connection_record, connection_proxy):
+            if connection_record.info['pid'] != os.getpid():
+                # Detach the connection without closing it, and let the pool open a new one
+                connection_record.connection = connection_proxy.connection = None
+                raise exc.DisconnectionError(
+                    f'Connection belongs to process {connection_record.info["pid"]}, '
+                    f'attempting to check out in process {os.getpid()}')
+
+        event.listen(self._engine, 'connect', record_pid)
+        event.listen(self._engine, 'checkout', check_pid)
+
+    def _check_fork(self):
+        """Start afresh with a new connection pool and no active transactions, when running
+        in a process forked from the one that initialized the provider"""
+        pid = os.getpid()
+        if pid != self._pid:
+            self._inherited_pools.append(self._engine.pool)
+            self._engine.pool = self._engine.pool.recreate()
+            self._transactions = threading.local()
+            self._pid = pid
+
     def get_session(self):
         """Establish a session to the Database"""
-        # Create the session
-        session_factory = orm.sessionmaker(bind=self._engine)
-        session_cls = orm.scoped_session(session_factory)
+        from sqlalchemy import orm
+
+        self._check_fork()
+
+        # Create the session. Each call returns a new registry, so that every repository gets a
+        #   session of its own, and sessions are never shared between threads.
+        session_cls = orm.scoped_session(self._session_factory)
 
         return session_cls
 
     def get_connection(self, session_cls=None):
         """ Create the connection to the Database instance"""
+        self._check_fork()
+
+        # Repositories created within a transaction share its session
+        if session_cls is None and self._active_sessions():
+            return self._active_sessions()[-1]
+
         # If this connection has to be created within an existing session,
         #   ``session_cls`` will be provided as an argument.
         #   Otherwise, fetch a new ``session_cls`` from ``get_session()``
@@ -42,12 +298,127 @@ class SAProvider(BaseProvider):
 
         return session_cls()
 
+    def _active_sessions(self):
+        """Return the stack of sessions of transactions active in the current thread"""
+        if not hasattr(self._transactions, 'sessions'):
+            self._transactions.sessions = []
+        return self._transactions.sessions
+
+    def in_transaction(self, conn):
+        """Return True if ``conn`` is the session of a transaction active in this thread"""
+        sessions = self._active_sessions()
+        return bool(sessions) and sessions[-1] is conn
+
+    @contextmanager
+    def transaction(self):
+        """Run repository operations in the block as a single Unit of Work
+
+        Repositories fetched within the block share one session. Their writes are flushed to
+        the database but committed only once, when the block exits, and are rolled back
+        together if the block raises an exception. Nested blocks run within a savepoint::
+
+            with provider.transaction():
+                Dog.create(name='Johnny', owner='John')
+                Dog.create(name='Cash', owner='John')
+        """
+        sessions = self._active_sessions()
+        if sessions:
+            session = sessions[-1]
+            savepoint = session.begin_nested()
+        else:
+            session = self.get_session()()
+            savepoint = None
+
+        # Changes captured, and callbacks queued to run on commit, before the block began,
+        #   which survive a rollback of the block
+        changes = session.info.setdefault('changes', [])
+        captured_before = len(changes)
+        callbacks = session.info.setdefault('after_commit', [])
+        queued_before = len(callbacks)
+
+        sessions.append(session)
+        try:
+            yield session
+            if savepoint is None:
+                session.commit()
+                for callback in session.info.pop('after_commit', []):
+                    callback()
+                self.invalidate_results(*session.info.pop('written_tables', ()))
+                self.publish_changes(session)
+            else:
+                savepoint.commit()
+        except Exception:
+            if savepoint is None:
+                session.rollback()
+            else:
+                savepoint.rollback()
+            del changes[captured_before:]
+            del callbacks[queued_before:]
+            raise
+        finally:
+            sessions.pop()
+            if savepoint is None:
+                session.close()
+
+    @contextmanager
+    def profile_memory(self):
+        """Profile memory allocated by repository calls within the block
+
+        Yields the :class:`MemoryProfiler`, whose `report()` lists the peak and retained memory
+        of the calls by entity and repository method.
+        """
+        previous = self.memory_profiler
+        with MemoryProfiler() as profiler:
+            self.memory_profiler = profiler
+            try:
+                yield profiler
+            finally:
+                self.memory_profiler = previous
+
+    def subscribe(self, subscriber):
+        """Register a callable to receive changes committed through repositories
+
+        Subscribers are called after each commit with the list of `ChangeEvent` objects of the
+        transaction. Errors raised by subscribers are logged, and do not affect the committed
+        changes. Returns the subscriber, so that this can be used as a decorator.
+        """
+        self._change_subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        """Stop sending committed changes to a subscriber"""
+        self._change_subscribers.remove(subscriber)
+
+    def captures_changes(self):
+        """Return True if changes are sent to subscribers or written to the outbox"""
+        return bool(self._change_subscribers) or self.outbox is not None
+
+    def publish_changes(self, session):
+        """Send the changes committed in a session to subscribers"""
+        changes = session.info.pop('changes', [])
+        if not changes:
+            return
+
+        for subscriber in list(self._change_subscribers):
+            try:
+                subscriber(changes)
+            except Exception:
+                logger.exception(f'Change subscriber {subscriber!r} failed')
+
+    def invalidate_results(self, *table_names):
+        """Remove cached `filter` results of tables that have been written to"""
+        if self.result_cache is not None:
+            for table_name in table_names:
+                self.result_cache.invalidate(table_name)
+
     def close_connection(self, conn):
         """ Close the connection to the Database instance """
         conn.close()
 
     def get_model(self, entity_cls):
         """Return a fully-baked Model class for a given Entity class"""
+        from protean_sqlalchemy.repository import SqlalchemyModel
+
         model_cls = None
 
         if entity_cls.meta_.schema_name in self._model_classes:
@@ -66,8 +437,86 @@ class SAProvider(BaseProvider):
 
     def get_repository(self, entity_cls):
         """ Return a repository object configured with a live connection"""
+        from protean_sqlalchemy.repository import SARepository
+
         return SARepository(self, entity_cls, self.get_model(entity_cls))
 
+    def create_partition(self, entity_cls, value, conn=None, pending: set = None):
+        """Create the partition of a partitioned entity's table that holds `value`
+
+        Partitions are created automatically as entities are created, but can also be created
+        ahead of time. The partition is created on `conn` if given (as part of its transaction),
+        or on a connection of its own. Only Postgres supports partitions natively, so this does
+        nothing on other databases. Returns the name of the partition, if any.
+
+        Partitions created on `conn` are rolled back along with its transaction, so they are
+        only remembered as existing once the caller has committed it, by adding them to
+        `_partitions`. Names are added to `pending`, if given, to skip partitions already
+        created in the transaction.
+        """
+        options = partition_options(entity_cls)
+        if options is None or value is None or self._engine.dialect.name != 'postgresql':
+            return None
+
+        table_name = entity_cls.meta_.schema_name
+        start = period_start(value, options.interval)
+        name = partition_name(table_name, start, options.interval)
+        if name not in self._partitions and (pending is None or name not in pending):
+            quote = self._engine.dialect.identifier_preparer.quote
+            end = period_end(start, options.interval)
+            (conn or self._engine).execute(
+                f'CREATE TABLE IF NOT EXISTS {quote(name)} PARTITION OF {quote(table_name)} '
+                f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')")
+            if conn is None:
+                self._partitions.add(name)
+            elif pending is not None:
+                pending.add(name)
+
+        return name
+
+    def drop_partitions(self, entity_cls, before):
+        """Remove the data of a partitioned entity in periods that end on or before `before`
+
+        On Postgres, whole partitions are dropped, and their names are returned. Other
+        databases have no native partitions, so the rows of those periods are deleted instead.
+        """
+        options = partition_options(entity_cls)
+        if options is None:
+            raise ConfigurationError(f'`{entity_cls.__name__}` is not partitioned')
+
+        table_name = entity_cls.meta_.schema_name
+        cutoff = period_start(before, options.interval)
+
+        if self._engine.dialect.name != 'postgresql':
+            model_cls = self.get_model(entity_cls)
+            column = getattr(model_cls, options.field_name)
+            if isinstance(entity_cls.meta_.declared_fields[options.field_name], field.DateTime):
+                cutoff = datetime.combine(cutoff, datetime.min.time())
+            self._engine.execute(model_cls.__table__.delete().where(column < cutoff))
+            self.invalidate_results(table_name)
+            return []
+
+        from sqlalchemy import text
+
+        partitions = self._engine.execute(text(
+            'SELECT child.relname FROM pg_inherits '
+            'JOIN pg_class parent ON parent.oid = pg_inherits.inhparent '
+            'JOIN pg_class child ON child.oid = pg_inherits.inhrelid '
+            'WHERE parent.relname = :table_name'), table_name=table_name)
+
+        dropped = []
+        quote = self._engine.dialect.identifier_preparer.quote
+        for name in sorted(row[0] for row in partitions):
+            start = partition_start(table_name, name, options.interval)
+            if start is not None and period_end(start, options.interval) <= cutoff:
+                self._engine.execute(f'DROP TABLE {quote(name)}')
+                self._partitions.discard(name)
+                dropped.append(name)
+
+        if dropped:
+            self.invalidate_results(table_name)
+        return dropped
+
     def raw(self, query: Any, data: Any = None):
         """Run raw query on Provider"""
         if data is None:
@@ -75,14 +524,19 @@ class SAProvider(BaseProvider):
         assert isinstance(query, str)
         assert isinstance(data, (dict, None))
 
-        return self.get_connection().execute(query, data)
+        # Outside a transaction, run the query on a connection released once the results are
+        #   read, rather than on a session that would stay in a transaction
+        self._check_fork()
+        if self._active_sessions():
+            return self._active_sessions()[-1].execute(query, data)
+        return self._engine.execute(query, data)
 
 
 operators = {
     'exact': '__eq__',
-    'iexact': 'ilike',
+    'iexact': '__eq__',
     'contains': 'contains',
-    'icontains': 'ilike',
+    'icontains': 'contains',
     'startswith': 'startswith',
     'endswith': 'endswith',
     'gt': '__gt__',
@@ -104,8 +558,19 @@ class DefaultLookup(BaseLookup):
         super().__init__(source, target)
 
     def process_source(self):
-        """Return source with transformations, if any"""
+        """Return source with transformations, if any
+
+        Compressed columns hold encoded bytes, which only compare meaningfully to NULL, so
+        other lookups on them are refused rather than silently matching nothing.
+        """
+        from protean_sqlalchemy.column_types import Compressed
+
         source_col = getattr(self.model_cls, self.source)
+        if isinstance(source_col.type, Compressed) and \
+                not (self.lookup_name == 'exact' and self.target is None):
+            raise ConfigurationError(
+                f'`{self.source}` of `{self.model_cls.entity_cls.__name__}` is stored '
+                f'compressed, and only supports `exact` lookups on `None`')
         return source_col
 
     def process_target(self):
@@ -126,9 +591,18 @@ class Exact(DefaultLookup):
 
 @SAProvider.register_lookup
 class IExact(DefaultLookup):
-    """Exact Case-Insensitive Match Query"""
+    """Exact Case-Insensitive Match Query
+
+    Compiles to ``lower(col) = lower(:value)``, which can use an index on ``lower(col)``,
+    like those created for the entity's ``case_insensitive_fields``.
+    """
     lookup_name = 'iexact'
 
+    def as_expression(self):
+        from sqlalchemy import func
+
+        return func.lower(self.process_source()) == func.lower(self.process_target())
+
 
 @SAProvider.register_lookup
 class Contains(DefaultLookup):
@@ -138,13 +612,27 @@ class Contains(DefaultLookup):
 
 @SAProvider.register_lookup
 class IContains(DefaultLookup):
-    """Exact Case-Insensitive Contains Query"""
+    """Exact Case-Insensitive Contains Query
+
+    Compiles to ``lower(col) LIKE '%' || lower(:value) || '%'``, with ``%`` and ``_`` in the
+    value matched literally.
+    """
     lookup_name = 'icontains'
+    escape_char = '/'
 
     def process_target(self):
-        """Return target in lowercase"""
+        """Return target with LIKE wildcards escaped"""
         assert isinstance(self.target, str)
-        return f"%{super().process_target()}%"
+        target = super().process_target()
+        for char in (self.escape_char, '%', '_'):
+            target = target.replace(char, self.escape_char + char)
+        return target
+
+    def as_expression(self):
+        from sqlalchemy import func
+
+        return func.lower(self.process_source()).contains(
+            func.lower(self.process_target()), escape=self.escape_char)
 
 
 @SAProvider.register_lookup
@@ -185,19 +673,90 @@ class LessThanOrEqual(DefaultLookup):
 
 @SAProvider.register_lookup
 class In(DefaultLookup):
-    """In Query"""
+    """In Query
+
+    Lists longer than ``max_params`` are not expanded into one bound parameter per value,
+    which would exceed SQLite's variable limit and make query planning slow on Postgres.
+    Instead, the list is sent as a single parameter: a JSON array unpacked with ``json_each``
+    on SQLite and an array compared with ``= ANY`` on Postgres. Other dialects receive the list
+    as ORed ``IN`` clauses of ``max_params`` values each.
+    """
     lookup_name = 'in'
+    max_params = 500
 
     def process_target(self):
         """Ensure target is a list or tuple"""
         assert isinstance(self.target, (list, tuple))
         return super().process_target()
 
+    def as_expression(self):
+        target = self.process_target()
+        if len(target) <= self.max_params:
+            return super().as_expression()
+
+        source = self.process_source()
+        dialect = self.model_cls.metadata.bind.dialect
+        if dialect.name == 'sqlite':
+            return self._json_each_expression(source, target, dialect)
+        elif dialect.name == 'postgresql':
+            return self._any_expression(source, target, dialect)
+        else:
+            return self._chunked_expression(source, target)
+
+    def _json_each_expression(self, source, target, dialect):
+        """Compare against the values of a JSON array, unpacked by SQLite"""
+        from sqlalchemy import String
+        from sqlalchemy import bindparam
+        from sqlalchemy import column
+        from sqlalchemy import func
+        from sqlalchemy import select
+
+        processor = source.type.bind_processor(dialect)
+        if processor:
+            target = [processor(value) for value in target]
+
+        # Binary values, like UUIDs, cannot be sent in a JSON array
+        try:
+            values = bindparam(None, json.dumps(list(target)), type_=String)
+        except TypeError:
+            return self._chunked_expression(source, self.process_target())
+        return source.in_(select([column('value')]).select_from(func.json_each(values)))
+
+    def _any_expression(self, source, target, dialect):
+        """Compare against a single Postgres array parameter"""
+        from sqlalchemy import any_
+        from sqlalchemy import bindparam
+        from sqlalchemy import cast
+        from sqlalchemy.dialects.postgresql import ARRAY
+        from sqlalchemy.sql.expression import Grouping
+        from sqlalchemy.types import TypeDecorator
+
+        if isinstance(source.type, TypeDecorator):
+            # Custom types bind values of another type, like UUIDs bound as text, so bind the
+            #   values as processed by the custom type, in an array cast to the column's type in
+            #   the database
+            target = [source.type.process_bind_param(value, dialect) for value in target]
+            array_type = ARRAY(source.type.load_dialect_impl(dialect))
+            values = cast(bindparam(None, list(target), type_=array_type), array_type)
+        else:
+            values = bindparam(None, list(target), type_=ARRAY(source.type))
+
+        # Group the comparison so that negating it renders ``NOT (col = ANY (...))``
+        #   instead of ``col != ANY (...)``, which has a different meaning
+        return Grouping(source == any_(values))
+
+    def _chunked_expression(self, source, target):
+        """Split the list into ORed ``IN`` clauses of ``max_params`` values"""
+        from sqlalchemy import or_
+
+        return or_(*[source.in_(target[index:index + self.max_params])
+                     for index in range(0, len(target), self.max_params)])
+
 
 @SAProvider.register_lookup
 class Overlap(DefaultLookup):
     """In Query"""
-    lookup_name = 'in'
+    lookup_name = 'overlap'
 
     def process_target(self):
         """Ensure target is a list or tuple"""
@@ -208,9 +767,36 @@ class Overlap(DefaultLookup):
 @SAProvider.register_lookup
 class Any(DefaultLookup):
     """In Query"""
-    lookup_name = 'in'
+    lookup_name = 'any'
 
     def process_target(self):
         """Ensure target is a list or tuple"""
         assert isinstance(self.target, (list, tuple))
         return super().process_target()
+
+
+@SAProvider.register_lookup
+class Search(DefaultLookup):
+    """Full-text Search Query
+
+    Matches entities whose full-text index, on all of the entity's ``search_fields``, contains
+    every word of the target text. The lookup can be used on any of the search fields.
+    """
+    lookup_name = 'search'
+
+    def process_target(self):
+        """Ensure target is a string"""
+        assert isinstance(self.target, str)
+        return super().process_target()
+
+    def as_expression(self):
+        entity_cls = self.model_cls.entity_cls
+        options = search_options(entity_cls)
+        if options is None or self.source not in options.field_names:
+            raise ConfigurationError(
+                f'`{entity_cls.__name__}` has no full-text index on `{self.source}`. '
+                f'Declare it in the `search_fields` option of the entity')
+
+        return search_expression(
+            self.model_cls.__table__, options, self.process_target(),
+            self.model_cls.metadata.bind.dialect)
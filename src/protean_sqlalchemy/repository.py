@@ -1,5 +1,11 @@
 """This module holds the definition of Database connectivity"""
-
+import copy
+import json
+import logging
+import random
+import time
+import uuid
+from types import SimpleNamespace
 from typing import Any
 
 from protean.core import field
@@ -9,12 +15,32 @@ from protean.core.repository import BaseRepository
 from protean.core.repository import ResultSet
 from protean.utils.query import Q
 from sqlalchemy import and_
+from sqlalchemy import func
 from sqlalchemy import or_
+from sqlalchemy import select
 from sqlalchemy.exc import DatabaseError
+from sqlalchemy.exc import InvalidRequestError
 from sqlalchemy.ext.declarative import as_declarative
 from sqlalchemy.ext.declarative import declared_attr
 
+from .changes import ChangeEvent
+from .column_types import GUID
+from .explain import QueryPlan
+from .explain import explain as explain_statement
+from .pagination import keyset_condition
+from .pagination import prefetched
+from .partition import partition_options
+from .profiling import profiled
 from .sa import DeclarativeMeta
+from .search import SEARCH_RANK
+from .search import rank_expression
+from .search import search_options
+from .timeout import statement_timeout
+
+logger = logging.getLogger('protean_sqlalchemy.repository')
+
+# Keyword arguments of `update_all` taken as options, rather than values to update
+UPDATE_ALL_OPTIONS = ('timeout', 'batch_size', 'throttle', 'progress')
 
 
 @as_declarative(metaclass=DeclarativeMeta)
@@ -36,7 +62,16 @@ class SqlalchemyModel(BaseModel):
             else:
                 item_dict[field_obj.field_name] = getattr(
                     entity, field_obj.field_name)
-        return cls(**item_dict)
+        model_obj = cls(**item_dict)
+
+        # Share the values last loaded from (or saved to) the database with the model object,
+        #   so that the repository can update just the changed columns and refresh the values
+        #   on the entity after saving
+        if not hasattr(entity.state_, '_loaded_values'):
+            entity.state_._loaded_values = {}
+        model_obj._loaded_values = entity.state_._loaded_values
+
+        return model_obj
 
     @classmethod
     def to_entity(cls, model_obj: 'SqlalchemyModel'):
@@ -44,12 +79,129 @@ class SqlalchemyModel(BaseModel):
         item_dict = {}
         for field_name in cls.entity_cls.meta_.attributes:
             item_dict[field_name] = getattr(model_obj, field_name, None)
-        return cls.entity_cls(item_dict)
+        entity = cls.entity_cls(item_dict)
+        entity.state_._loaded_values = cls.snapshot(item_dict)
+        return entity
+
+    @staticmethod
+    def snapshot(values: dict):
+        """Copy values to compare against later, including lists and dicts that may be
+        modified in place"""
+        return {
+            name: copy.deepcopy(value) if isinstance(value, (list, dict)) else value
+            for name, value in values.items()}
 
 
 class SARepository(BaseRepository):
     """Repository implementation for Databases compliant with SQLAlchemy"""
 
+    # Number of identifiers fetched per query by `get_many()`
+    get_many_chunk_size = 500
+
+    def _commit(self):
+        """Commit the session, or only flush it when it belongs to an active transaction
+
+        The transaction commits all changes at once when its block exits.
+        """
+        if self.provider.in_transaction(self.conn):
+            self.conn.flush()
+        else:
+            self.conn.commit()
+            self.provider.publish_changes(self.conn)
+
+    def _rollback(self):
+        """Roll back the session, unless an active transaction will roll it back as a unit"""
+        if not self.provider.in_transaction(self.conn):
+            self.conn.rollback()
+            self.conn.info.pop('changes', None)
+
+    def _release(self):
+        """Return the session's connection to the pool after a read, unless the session belongs
+        to an active transaction
+
+        Sessions are not closed by Protean, and would otherwise hold their connection until they
+        are garbage collected, possibly in another thread.
+        """
+        if not self.provider.in_transaction(self.conn):
+            self.conn.close()
+
+    def _after_commit(self, callback):
+        """Run a callback once the session's writes are committed
+
+        Outside a transaction, writes have just been committed and the callback runs right away.
+        Within one, it runs when the transaction commits, and is discarded if the writes are
+        rolled back.
+        """
+        if self.provider.in_transaction(self.conn):
+            self.conn.info.setdefault('after_commit', []).append(callback)
+        else:
+            callback()
+
+    def _written(self):
+        """Invalidate cached `filter` results of the table once a write is committed"""
+        table_name = self.model_cls.__tablename__
+        if self.provider.in_transaction(self.conn):
+            self.conn.info.setdefault('written_tables', set()).add(table_name)
+        self.provider.invalidate_results(table_name)
+
+    def _result_cache(self, explain: bool = False):
+        """Return the provider's result cache, unless it must be bypassed
+
+        Queries in a transaction may see its uncommitted writes, and explained queries must
+        reach the database, so their results are neither read from nor stored in the cache.
+        """
+        if explain or self.provider.in_transaction(self.conn):
+            return None
+        return self.provider.result_cache
+
+    def _cached_result(self, cache, key, offset: int, limit: int):
+        """Return the result of a filter from the result cache, or None"""
+        cached = cache.get(key)
+        if cached is None:
+            return None
+
+        total, rows = cached
+        return ResultSet(
+            offset=offset,
+            limit=limit,
+            total=total,
+            items=[SimpleNamespace(**row) for row in rows])
+
+    def _cache_result(self, cache, key, version, result: ResultSet):
+        """Store the result of a filter in the result cache, as field values"""
+        rows = [
+            {name: getattr(item, name, None) for name in self.entity_cls.meta_.attributes}
+            for item in result.items]
+        cache.set(self.model_cls.__tablename__, key, (result.total, rows), version)
+
+    def _record_change(self, operation: str, identifiers, changes: dict):
+        """Capture a write for subscribers of the provider, and write it to the outbox table
+        in the same transaction if one is configured"""
+        if not self.provider.captures_changes() or not identifiers:
+            return
+
+        change = ChangeEvent(
+            entity_name=self.entity_cls.__name__,
+            operation=operation,
+            identifiers=list(identifiers),
+            changes=changes)
+        self.conn.info.setdefault('changes', []).append(change)
+
+        outbox = self.provider.outbox
+        if outbox is not None:
+            self.conn.execute(outbox.insert().values(
+                entity_name=change.entity_name,
+                operation=change.operation,
+                identifiers=json.dumps(change.identifiers, default=str),
+                changes=json.dumps(change.changes, default=str)))
+
+    def _timeout(self, timeout: float = None):
+        """Return the time budget of a statement, defaulting to the provider's
+        `STATEMENT_TIMEOUT`"""
+        if timeout is None:
+            return self.provider.conn_info.get('STATEMENT_TIMEOUT')
+        return timeout
+
     def _build_filters(self, criteria: Q):
         """ Recursively Build the filters from the criteria object"""
         # Decide the function based on the connector type
@@ -72,9 +224,75 @@ class SARepository(BaseRepository):
 
         return func(*params)
 
+    def _order_by_clauses(self, order_by: list, criteria: Q = None):
+        """ Build the order by clauses, descending for columns prefixed with `-`
+
+        `search_rank` orders by relevance to the text of the first `search` lookup in the
+        criteria, so `-search_rank` lists the most relevant results first.
+        """
+        order_cols = []
+        for order_col in order_by:
+            if order_col.lstrip('-') == SEARCH_RANK:
+                col = self._rank_clause(criteria)
+                if col is None:
+                    continue
+            else:
+                col = getattr(self.model_cls, order_col.lstrip('-'))
+            if order_col.startswith('-'):
+                order_cols.append(col.desc())
+            else:
+                order_cols.append(col)
+        return order_cols
+
+    def _rank_clause(self, criteria: Q):
+        """ Return the relevance of records to the first `search` lookup in the criteria"""
+        text = self._search_text(criteria) if criteria is not None else None
+        if text is None:
+            raise ValueError(f'`{SEARCH_RANK}` can only order results of a `search` lookup')
+
+        return rank_expression(
+            self.model_cls.__table__, search_options(self.entity_cls), text,
+            self.model_cls.metadata.bind.dialect)
+
+    def _search_text(self, criteria: Q):
+        """ Return the text of the first non-negated `search` lookup in the criteria"""
+        if criteria.negated:
+            return None
+
+        for child in criteria.children:
+            if isinstance(child, Q):
+                text = self._search_text(child)
+                if text is not None:
+                    return text
+            elif child[0].endswith('__search'):
+                return child[1]
+        return None
+
+    @profiled
     def filter(self, criteria: Q, offset: int = 0, limit: int = 10,
-               order_by: list = ()) -> ResultSet:
-        """ Filter objects from the sqlalchemy database """
+               order_by: list = (), read_only: bool = None,
+               explain: bool = False, timeout: float = None) -> ResultSet:
+        """ Filter objects from the sqlalchemy database
+
+        With `read_only`, the query runs through SQLAlchemy Core and the results are plain
+        rows, instead of model objects tracked in the session's identity map. The default
+        is read from the `READ_ONLY_FILTER` key of the provider's connection info.
+
+        With `explain`, the query plan is captured as well. Plans of slow or sampled queries
+        can also be captured automatically, with the `EXPLAIN_THRESHOLD` and
+        `EXPLAIN_SAMPLE_RATE` keys of the provider's connection info.
+
+        Queries running longer than `timeout` seconds (defaulting to the `STATEMENT_TIMEOUT` key
+        of the provider's connection info) are cancelled with a `StatementTimeoutError`.
+
+        Results are served from the provider's result cache, if one is configured with the
+        `RESULT_CACHE` key, until the entity's table is written to.
+        """
+        if read_only is None:
+            read_only = self.provider.conn_info.get('READ_ONLY_FILTER', False)
+        if read_only:
+            return self._filter_rows(criteria, offset, limit, order_by, explain, timeout)
+
         qs = self.conn.query(self.model_cls)
 
         # Build the filters from the criteria
@@ -82,47 +300,242 @@ class SARepository(BaseRepository):
             qs = qs.filter(self._build_filters(criteria))
 
         # Apply the order by clause if present
-        order_cols = []
-        for order_col in order_by:
-            col = getattr(self.model_cls, order_col.lstrip('-'))
-            if order_col.startswith('-'):
-                order_cols.append(col.desc())
-            else:
-                order_cols.append(col)
-        qs = qs.order_by(*order_cols)
-        qs = qs.limit(limit).offset(offset)
+        qs = qs.order_by(*self._order_by_clauses(order_by, criteria))
+        page_qs = qs.limit(limit).offset(offset)
+
+        cache = self._result_cache(explain)
+        if cache is not None:
+            key = cache.key(page_qs.statement, self.provider._engine.dialect)
+            cached = self._cached_result(cache, key, offset, limit)
+            if cached is not None:
+                return cached
+            version = cache.version(self.model_cls.__tablename__)
 
         # Return the results
         try:
-            items = qs.all()
-            result = ResultSet(
-                offset=offset,
-                limit=limit,
-                total=qs.count(),
-                items=items[offset: offset + limit])
+            with statement_timeout(self.conn, self._timeout(timeout)):
+                started = time.perf_counter()
+                items = page_qs.all()
+                duration = time.perf_counter() - started
+
+                result = ResultSet(
+                    offset=offset,
+                    limit=limit,
+                    total=qs.count(),
+                    items=items)
         except DatabaseError:
-            self.conn.rollback()
+            self._rollback()
+            raise
+
+        self._capture_plan(page_qs.statement, criteria, duration, explain)
+        self._release()
+
+        if cache is not None:
+            self._cache_result(cache, key, version, result)
+
+        return result
+
+    def _filter_rows(self, criteria: Q, offset: int, limit: int,
+                     order_by: list, explain: bool = False,
+                     timeout: float = None) -> ResultSet:
+        """ Filter rows with a Core select, bypassing the ORM"""
+        table = self.model_cls.__table__
+        stmt = select([table])
+        count_stmt = select([func.count()]).select_from(table)
+
+        # Build the filters from the criteria
+        if criteria.children:
+            filters = self._build_filters(criteria)
+            stmt = stmt.where(filters)
+            count_stmt = count_stmt.where(filters)
+
+        stmt = stmt.order_by(*self._order_by_clauses(order_by, criteria)).limit(limit).offset(offset)
+
+        cache = self._result_cache(explain)
+        if cache is not None:
+            key = cache.key(stmt, self.provider._engine.dialect)
+            cached = self._cached_result(cache, key, offset, limit)
+            if cached is not None:
+                return cached
+            version = cache.version(self.model_cls.__tablename__)
+
+        # Return the results
+        try:
+            with statement_timeout(self.conn, self._timeout(timeout)):
+                started = time.perf_counter()
+                items = self.conn.execute(stmt).fetchall()
+                duration = time.perf_counter() - started
+
+                result = ResultSet(
+                    offset=offset,
+                    limit=limit,
+                    total=self.conn.execute(count_stmt).scalar(),
+                    items=items)
+        except DatabaseError:
+            self._rollback()
             raise
 
+        self._capture_plan(stmt, criteria, duration, explain)
+        self._release()
+
+        if cache is not None:
+            self._cache_result(cache, key, version, result)
+
         return result
 
+    def iter_pages(self, criteria: Q = None, page_size: int = 100, order_by: list = (),
+                   prefetch: int = 2):
+        """ Iterate over all entities satisfying the criteria, a page (list of entities) at a time
+
+        Pages are fetched with keyset pagination: entities are ordered by the `order_by` fields
+        and then by identifier, and each page starts after the last entity of the previous page.
+        Pages cost the same however deep they are, and entities are neither skipped nor repeated
+        when other entities are written in between. Fields ordered by must not hold nulls.
+
+        Up to `prefetch` pages are fetched ahead by a background thread, over connections of its
+        own, while the caller processes the current page. Within a transaction, or with a
+        `prefetch` of 0, pages are fetched on the repository's session as they are needed.
+        """
+        in_transaction = self.provider.in_transaction(self.conn)
+        if prefetch <= 0 or in_transaction:
+            return self._keyset_pages(criteria, page_size, order_by, self.conn)
+
+        self.provider._check_fork()
+        return prefetched(
+            self._keyset_pages(criteria, page_size, order_by, self.provider._engine), prefetch)
+
+    def _keyset_pages(self, criteria: Q, page_size: int, order_by: list, conn):
+        """ Fetch pages of entities with Core selects on `conn`, after the last row of each page"""
+        table = self.model_cls.__table__
+        id_column = table.c[self.entity_cls.meta_.id_field.field_name]
+
+        keys = []
+        for order_col in order_by:
+            name = order_col.lstrip('-')
+            if name == SEARCH_RANK:
+                raise ValueError(f'Pages cannot be ordered by `{SEARCH_RANK}`')
+            keys.append((table.c[name], order_col.startswith('-')))
+        if id_column not in [column for column, _ in keys]:
+            keys.append((id_column, False))
+
+        stmt = select([table]).order_by(
+            *[column.desc() if descending else column for column, descending in keys])
+        if criteria is not None and criteria.children:
+            stmt = stmt.where(self._build_filters(criteria))
+
+        # Build the statements before the first page is requested, so that invalid criteria
+        #   and ordering are reported by the call itself
+        def pages():
+            page_stmt = stmt
+            while True:
+                try:
+                    rows = conn.execute(page_stmt.limit(page_size)).fetchall()
+                except DatabaseError:
+                    if conn is self.conn:
+                        self._rollback()
+                    raise
+
+                # Keep no transaction open while the caller processes the page, as it would
+                #   lock writers out of SQLite databases
+                if conn is self.conn:
+                    self._release()
+
+                if rows:
+                    entities = []
+                    for row in rows:
+                        entity = self.model_cls.to_entity(row)
+                        entity.state_.mark_retrieved()
+                        entities.append(entity)
+                    yield entities
+                if len(rows) < page_size:
+                    return
+                page_stmt = stmt.where(keyset_condition(keys, rows[-1]))
+
+        return pages()
+
+    def _capture_plan(self, statement, criteria: Q, duration: float, explain: bool = False):
+        """ Capture the query plan of a statement with the database's EXPLAIN command
+
+        Plans are captured when asked for explicitly, for queries that took at least
+        `EXPLAIN_THRESHOLD` seconds, and for a random `EXPLAIN_SAMPLE_RATE` fraction of
+        queries, as configured in the provider's connection info. Captured plans are logged and
+        recorded in the provider's `query_plans`, and are flagged if they scan the full table.
+        """
+        threshold = self.provider.conn_info.get('EXPLAIN_THRESHOLD')
+        sample_rate = self.provider.conn_info.get('EXPLAIN_SAMPLE_RATE', 0)
+        if not (explain or
+                (threshold is not None and duration >= threshold) or
+                random.random() < sample_rate):
+            return
+
+        dialect = self.provider._engine.dialect
+        try:
+            plan, full_scan = explain_statement(self.conn, statement, dialect)
+        except DatabaseError:
+            logger.exception(f'Unable to capture query plan for `{self.entity_cls.__name__}`')
+            return
+
+        query_plan = QueryPlan(
+            entity_name=self.entity_cls.__name__,
+            criteria=criteria.deconstruct(),
+            duration=duration,
+            statement=str(statement.compile(dialect=dialect)),
+            plan=plan,
+            full_scan=full_scan)
+        self.provider.query_plans.append(query_plan)
+
+        log = logger.warning if full_scan else logger.info
+        log(f'Query plan for `{query_plan.entity_name}` with criteria {query_plan.criteria} '
+            f'({duration:.6f}s{", full table scan" if full_scan else ""}): {plan}')
+
+    @profiled
     def create(self, model_obj):
         """ Add a new record to the sqlalchemy database"""
+        partition = None
+        partitioning = partition_options(self.entity_cls)
+        if partitioning is not None:
+            partition = self.provider.create_partition(
+                self.entity_cls, getattr(model_obj, partitioning.field_name), self.conn)
+
         self.conn.add(model_obj)
 
         try:
             # If the model has Auto fields then flush to get them
             if self.entity_cls.meta_.auto_fields:
                 self.conn.flush()
-            self.conn.commit()
+
+            values = {
+                field_name: getattr(model_obj, field_name, None)
+                for field_name in self.entity_cls.meta_.attributes}
+            self._record_change(
+                'create', [getattr(model_obj, self.entity_cls.meta_.id_field.field_name)], values)
+            self._commit()
         except DatabaseError:
-            self.conn.rollback()
+            self._rollback()
             raise
 
+        if partition is not None:
+            self._after_commit(lambda: self.provider._partitions.add(partition))
+        self._after_commit(lambda: self._refresh_loaded_values(model_obj, values))
+        self._written()
+
         return model_obj
 
+    def _refresh_loaded_values(self, model_obj, values: dict):
+        """Record saved values on the entity the model object was built from, once they are
+        committed"""
+        loaded_values = getattr(model_obj, '_loaded_values', None)
+        if loaded_values is not None:
+            loaded_values.update(self.model_cls.snapshot(values))
+
+    @profiled
     def update(self, model_obj):
-        """ Update a record in the sqlalchemy database"""
+        """ Update a record in the sqlalchemy database
+
+        Only columns whose values differ from those last loaded from (or saved to) the database
+        are written, and no statement is issued at all if nothing has changed. All columns are
+        written if the entity's loaded values are not known.
+        """
         primary_key, data = {}, {}
         for field_name, field_obj in \
                 self.entity_cls.meta_.declared_fields.items():
@@ -137,67 +550,308 @@ class SARepository(BaseRepository):
                 else:
                     data[field_name] = getattr(model_obj, field_name, None)
 
+        # Skip columns that have not changed since the entity was loaded
+        loaded_values = getattr(model_obj, '_loaded_values', None) or {}
+        data = {
+            column: value for column, value in data.items()
+            if column not in loaded_values or loaded_values[column] != value}
+        if not data:
+            return model_obj
+
         # Run the update query and commit the results
         try:
             self.conn.query(self.model_cls).filter_by(
                 **primary_key).update(data)
-            self.conn.commit()
+            self._record_change('update', primary_key.values(), data)
+            self._commit()
         except DatabaseError:
-            self.conn.rollback()
+            self._rollback()
             raise
 
+        self._after_commit(lambda: self._refresh_loaded_values(model_obj, data))
+        self._invalidate_cache(primary_key.values())
+        self._written()
+
         return model_obj
 
+    @profiled
     def update_all(self, criteria: Q, *args, **kwargs):
-        """ Update all objects satisfying the criteria """
-        # Delete the objects and commit the results
+        """ Update all objects satisfying the criteria
+
+        Values can be given as dictionaries or keyword arguments. Keyword arguments also take
+        the options below, unless the entity has a field of the same name, in which case they
+        are values of that field:
+
+        * `timeout`: Statements running longer than `timeout` seconds are cancelled.
+        * `batch_size`: Objects are updated in batches of `batch_size` (defaulting to the
+          `BULK_BATCH_SIZE` key of the provider's connection info), each committed separately.
+        * `throttle` and `progress`: See :meth:`_in_batches`.
+        """
+        options = {
+            name: kwargs.pop(name) for name in UPDATE_ALL_OPTIONS
+            if name in kwargs and name not in self.entity_cls.meta_.declared_fields}
+        timeout = options.get('timeout')
+        batch_size = options.get('batch_size')
+
+        values = {}
+        for arg in args:
+            values.update(arg)
+        values.update(kwargs)
+
+        # Update the objects and commit the results
         qs = self.conn.query(self.model_cls).filter(self._build_filters(criteria))
+        batch_size = self._batch_size(batch_size)
+        if batch_size:
+            return self._in_batches(
+                'update_all', qs, values, batch_size, options.get('throttle'),
+                options.get('progress'), timeout)
+
         try:
-            values = args or {}
-            values.update(kwargs)
-            updated_count = qs.update(values)
-            self.conn.commit()
+            with statement_timeout(self.conn, self._timeout(timeout)):
+                identifiers = self._matching_identifiers(qs)
+                updated_count = self._synchronized(qs.update, values)
+            self._record_change('update_all', identifiers, values)
+            self._commit()
         except DatabaseError:
-            self.conn.rollback()
+            self._rollback()
             raise
+
+        self._invalidate_cache(identifiers)
+        self._written()
+
         return updated_count
 
+    @profiled
     def delete(self, model_obj):
         """ Delete the entity record in the dictionary """
         identifier = getattr(model_obj, self.entity_cls.meta_.id_field.field_name)
         primary_key = {self.entity_cls.meta_.id_field.field_name: identifier}
         try:
             self.conn.query(self.model_cls).filter_by(**primary_key).delete()
-            self.conn.commit()
+            self._record_change('delete', [identifier], {})
+            self._commit()
         except DatabaseError:
-            self.conn.rollback()
+            self._rollback()
             raise
 
+        self._invalidate_cache([identifier])
+        self._written()
+
         return model_obj
 
-    def delete_all(self, criteria: Q = None):
-        """ Delete a record from the sqlalchemy database"""
+    @profiled
+    def delete_all(self, criteria: Q = None, timeout: float = None, batch_size: int = None,
+                   throttle: float = None, progress=None):
+        """ Delete all records satisfying the criteria from the sqlalchemy database
+
+        With a `batch_size` (defaulting to the `BULK_BATCH_SIZE` key of the provider's
+        connection info), records are deleted in batches, each committed separately. See
+        :meth:`_in_batches` for `throttle` and `progress`.
+        """
         del_count = 0
         if criteria:
             qs = self.conn.query(self.model_cls).filter(self._build_filters(criteria))
         else:
             qs = self.conn.query(self.model_cls)
 
+        batch_size = self._batch_size(batch_size)
+        if batch_size:
+            return self._in_batches('delete_all', qs, {}, batch_size, throttle, progress, timeout)
+
         try:
-            del_count = qs.delete()
-            self.conn.commit()
+            with statement_timeout(self.conn, self._timeout(timeout)):
+                identifiers = self._matching_identifiers(qs)
+                del_count = self._synchronized(qs.delete)
+            self._record_change('delete_all', identifiers, {})
+            self._commit()
         except DatabaseError:
-            self.conn.rollback()
+            self._rollback()
             raise
 
+        self._invalidate_cache(identifiers)
+        self._written()
+
         return del_count
 
-    def raw(self, query: Any, data: Any = None):
+    def _batch_size(self, batch_size: int = None):
+        """Return the number of records updated or deleted per batch, defaulting to the
+        provider's `BULK_BATCH_SIZE`"""
+        if batch_size is None:
+            return self.provider.conn_info.get('BULK_BATCH_SIZE')
+        return batch_size
+
+    def _in_batches(self, operation: str, qs, values: dict, batch_size: int,
+                    throttle: float = None, progress=None, timeout: float = None) -> int:
+        """ Update (`update_all`) or delete (`delete_all`) the records matching a query, in
+        batches of `batch_size` records
+
+        Batches are walked in the order of identifiers, and each batch is committed separately,
+        so that locks are held briefly and no single transaction grows with the number of
+        records. Batches committed before an error remain committed. Within a transaction,
+        batches are only flushed, and the transaction commits them all at once.
+
+        The process sleeps `throttle` seconds between batches, to let other writers and
+        replicas keep up, and `progress` is called after each batch with the number of records
+        processed so far. Returns the number of records processed.
+        """
+        id_column = getattr(self.model_cls, self.entity_cls.meta_.id_field.field_name)
+        processed = 0
+        last_identifier = None
+        while True:
+            batch_qs = qs if last_identifier is None else qs.filter(id_column > last_identifier)
+            try:
+                with statement_timeout(self.conn, self._timeout(timeout)):
+                    identifiers = [
+                        row[0] for row in
+                        batch_qs.with_entities(id_column).order_by(id_column).limit(batch_size)]
+                    if not identifiers:
+                        break
+
+                    # Records that stopped matching the criteria since are skipped
+                    batch_qs = qs.filter(id_column.in_(identifiers))
+                    if operation == 'update_all':
+                        count = self._synchronized(batch_qs.update, values)
+                    else:
+                        count = self._synchronized(batch_qs.delete)
+                self._record_change(operation, identifiers, values)
+                self._commit()
+            except DatabaseError:
+                self._rollback()
+                raise
+
+            self._invalidate_cache(identifiers)
+            self._written()
+
+            processed += count
+            last_identifier = identifiers[-1]
+            if progress is not None:
+                progress(processed)
+            if len(identifiers) < batch_size:
+                break
+            if throttle:
+                time.sleep(throttle)
+
+        self._release()
+        return processed
+
+    @profiled
+    def get_many(self, identifiers: list) -> list:
+        """ Fetch entities by their identifiers, in the order of the identifiers
+
+        Returns a list with the entity for each identifier, or `None` where no entity exists.
+        Records are looked up in the provider's cache first, if one is configured, and the rest
+        are fetched with `IN` queries on the identifier column, `get_many_chunk_size`
+        identifiers at a time. Within a transaction, the cache is bypassed, as records may hold
+        uncommitted writes.
+        """
+        id_field_name = self.entity_cls.meta_.id_field.field_name
+        identifiers = [self._load_identifier(identifier) for identifier in identifiers]
+        records = {}
+
+        cache = self.provider.cache
+        if self.provider.in_transaction(self.conn):
+            cache = None
+        if cache is not None:
+            cached = cache.get_many([self._cache_key(identifier) for identifier in identifiers])
+            for identifier in identifiers:
+                if self._cache_key(identifier) in cached:
+                    records[identifier] = cached[self._cache_key(identifier)]
+
+        # Fetch each missing identifier once, even if it was requested more than once
+        missing = list(dict.fromkeys(
+            identifier for identifier in identifiers if identifier not in records))
+
+        table = self.model_cls.__table__
+        id_column = table.c[id_field_name]
+        fetched = {}
+        try:
+            for index in range(0, len(missing), self.get_many_chunk_size):
+                chunk = missing[index:index + self.get_many_chunk_size]
+                for row in self.conn.execute(select([table]).where(id_column.in_(chunk))):
+                    fetched[row[id_field_name]] = dict(row)
+        except DatabaseError:
+            self._rollback()
+            raise
+        self._release()
+
+        if cache is not None and fetched:
+            cache.set_many({
+                self._cache_key(identifier): record for identifier, record in fetched.items()})
+        records.update(fetched)
+
+        entities = []
+        for identifier in identifiers:
+            entity = None
+            if identifier in records:
+                entity = self.model_cls.to_entity(SimpleNamespace(**records[identifier]))
+                entity.state_.mark_retrieved()
+            entities.append(entity)
+        return entities
+
+    def _load_identifier(self, identifier):
+        """ Convert an identifier to the value read back from the identifier column
+
+        Identifiers are loaded by the identifier field. Auto-generated identifiers, which the
+        field keeps as they are, are converted to integers, and UUIDs to their canonical form.
+        """
+        id_field = self.entity_cls.meta_.id_field
+        identifier = id_field._load(identifier)
+        column_type = self.model_cls.__table__.c[id_field.field_name].type
+        try:
+            if isinstance(column_type, GUID):
+                return str(uuid.UUID(str(identifier)))
+            if isinstance(id_field, field.Auto):
+                return int(identifier)
+        except (TypeError, ValueError):
+            pass
+        return identifier
+
+    def _cache_key(self, identifier):
+        """ Return the key of an entity record in the provider's cache"""
+        return f'{self.schema_name}:{identifier}'
+
+    def _synchronized(self, bulk_method, *args):
+        """ Run a bulk update or delete, keeping objects in the session in sync
+
+        Criteria are evaluated on the objects in Python where SQLAlchemy can evaluate them, and
+        matching rows are fetched otherwise, like for `in` lookups.
+        """
+        try:
+            return bulk_method(*args)
+        except InvalidRequestError:
+            return bulk_method(*args, synchronize_session='fetch')
+
+    def _matching_identifiers(self, qs):
+        """ Return identifiers of records matching a query, if they may be cached or their
+        changes are captured"""
+        if self.provider.cache is None and not self.provider.captures_changes():
+            return []
+
+        id_column = getattr(self.model_cls, self.entity_cls.meta_.id_field.field_name)
+        return [row[0] for row in qs.with_entities(id_column)]
+
+    def _invalidate_cache(self, identifiers):
+        """ Remove records that have changed from the provider's cache
+
+        Within a transaction, records are removed again when it commits, as other sessions may
+        cache the records as last committed in the meantime.
+        """
+        if self.provider.cache is None or not identifiers:
+            return
+
+        keys = [self._cache_key(identifier) for identifier in identifiers]
+        self.provider.cache.delete_many(keys)
+        if self.provider.in_transaction(self.conn):
+            self._after_commit(lambda: self.provider.cache.delete_many(keys))
+
+    @profiled
+    def raw(self, query: Any, data: Any = None, timeout: float = None):
         """Run a raw query on the repository and return entity objects"""
         assert isinstance(query, str)
 
         try:
-            results = self.conn.execute(query)
+            with statement_timeout(self.conn, self._timeout(timeout)):
+                results = self.conn.execute(query).fetchall()
 
             entity_items = []
             for item in results:
@@ -211,7 +865,8 @@ class SARepository(BaseRepository):
                 total=len(entity_items),
                 items=entity_items)
         except DatabaseError:
-            self.conn.rollback()
+            self._rollback()
             raise
+        self._release()
 
         return result
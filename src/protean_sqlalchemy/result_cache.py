@@ -0,0 +1,134 @@
+"""Module to cache results of `filter` calls, until the table they were read from is written to
+
+Results are keyed on the compiled statement and its parameters, and evicted least recently used
+first once the cache holds more than its maximum size. Writes through repositories invalidate
+the results of their table in this process. Other processes are told about writes by the
+callables registered with :meth:`ResultCache.on_invalidate`, and invalidate their own caches by
+calling :meth:`ResultCache.invalidate` with ``propagate=False``::
+
+    @provider.result_cache.on_invalidate
+    def publish(table_name):
+        redis.publish('invalidations', table_name)
+"""
+import logging
+import pickle
+import threading
+from collections import OrderedDict
+from collections import namedtuple
+
+logger = logging.getLogger('protean_sqlalchemy.result_cache')
+
+# A cached result: the table it was read from, its size in bytes, and the pickled result
+CacheEntry = namedtuple('CacheEntry', 'table_name, size, data')
+
+
+class ResultCache:
+    """Least recently used cache of query results, bounded by the size of the pickled results
+
+    Each table has a version, incremented when the table is invalidated. Results are only
+    stored if their table's version has not changed since the query started, so that results
+    read concurrently with a write are never cached.
+    """
+
+    def __init__(self, max_size: int = 16 * 1024 * 1024):
+        self.max_size = max_size
+        self.size = 0
+
+        # Number of lookups that found a result, and that did not
+        self.hits = 0
+        self.misses = 0
+
+        self._entries = OrderedDict()
+        self._keys_by_table = {}
+        self._versions = {}
+        self._generation = 0
+        self._invalidation_hooks = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(statement, dialect) -> tuple:
+        """Return the cache key of a statement: its SQL and the values of its parameters"""
+        compiled = statement.compile(dialect=dialect)
+        return str(compiled), tuple(
+            (name, repr(value)) for name, value in sorted(compiled.params.items()))
+
+    def version(self, table_name: str) -> tuple:
+        """Return the current version of a table, which changes when it is invalidated or the
+        cache is cleared"""
+        return self._generation, self._versions.get(table_name, 0)
+
+    def get(self, key):
+        """Return a copy of the result cached for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return pickle.loads(entry.data)
+
+    def set(self, table_name: str, key, value, version: tuple):
+        """Cache a result read from a table at `version`
+
+        Results are skipped if the table has been invalidated since, or if they are larger
+        than the whole cache.
+        """
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_size:
+            return
+
+        with self._lock:
+            if self.version(table_name) != version:
+                return
+
+            self._remove(key)
+            self._entries[key] = CacheEntry(table_name=table_name, size=len(data), data=data)
+            self._keys_by_table.setdefault(table_name, set()).add(key)
+            self.size += len(data)
+
+            while self.size > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """Remove an entry, if it is cached"""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry.size
+            self._keys_by_table[entry.table_name].discard(key)
+
+    def invalidate(self, table_name: str, propagate: bool = True):
+        """Remove the results read from a table, and stop queries in progress from caching theirs
+
+        Invalidation hooks are called with the table name, unless `propagate` is False.
+        """
+        with self._lock:
+            self._versions[table_name] = self._versions.get(table_name, 0) + 1
+            for key in list(self._keys_by_table.get(table_name, ())):
+                self._remove(key)
+
+        if propagate:
+            for hook in list(self._invalidation_hooks):
+                try:
+                    hook(table_name)
+                except Exception:
+                    logger.exception(f'Result cache invalidation hook {hook!r} failed')
+
+    def on_invalidate(self, hook):
+        """Register a callable to be called with the name of each table invalidated in this
+        process, to invalidate the caches of other processes. Returns the hook, so that this can
+        be used as a decorator."""
+        self._invalidation_hooks.append(hook)
+        return hook
+
+    def clear(self):
+        """Remove all cached results, and stop queries in progress from caching theirs"""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_table.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
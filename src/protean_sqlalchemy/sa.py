@@ -5,11 +5,84 @@
 from abc import ABCMeta
 
 from protean.core import field
+from protean.core.exceptions import ConfigurationError
 from protean.core.repository import repo_factory
 
-from sqlalchemy import types as sa_types, Column
+from sqlalchemy import types as sa_types, Column, Index, func
 from sqlalchemy.ext import declarative as sa_dec
 
+from protean_sqlalchemy.column_types import CODECS
+from protean_sqlalchemy.column_types import GUID
+from protean_sqlalchemy.column_types import Compressed
+from protean_sqlalchemy.column_types import integer_type
+from protean_sqlalchemy.partition import partition_options
+from protean_sqlalchemy.search import index_search_fields
+from protean_sqlalchemy.search import search_options
+
+
+def uuid_fields(entity_cls):
+    """Return the names of the String fields of an entity that hold UUIDs"""
+    meta = getattr(entity_cls, 'Meta', None)
+    field_names = getattr(meta, 'uuid_fields', None) or ()
+    if isinstance(field_names, str):
+        field_names = (field_names, )
+
+    for field_name in field_names:
+        if not isinstance(entity_cls.meta_.declared_fields.get(field_name), field.String):
+            raise ConfigurationError(
+                f'`{entity_cls.__name__}` can only store UUIDs in String fields, '
+                f'not `{field_name}`')
+    return tuple(field_names)
+
+
+def compressed_fields(entity_cls):
+    """Return the codec of each field of an entity that is stored compressed
+
+    The `compressed_fields` option lists the fields to compress with the `compression` codec
+    (zlib by default), or maps fields to their codecs.
+    """
+    meta = getattr(entity_cls, 'Meta', None)
+    field_names = getattr(meta, 'compressed_fields', None) or ()
+    if isinstance(field_names, str):
+        field_names = (field_names, )
+    if not isinstance(field_names, dict):
+        codec = getattr(meta, 'compression', 'zlib')
+        field_names = {field_name: codec for field_name in field_names}
+
+    searching = search_options(entity_cls)
+    indexed_fields = set(case_insensitive_fields(entity_cls)).union(
+        searching.field_names if searching else ())
+    for field_name, codec in field_names.items():
+        field_obj = entity_cls.meta_.declared_fields.get(field_name)
+        if not isinstance(field_obj, (field.Text, field.List, field.Dict)):
+            raise ConfigurationError(
+                f'`{entity_cls.__name__}` can only compress Text, List or Dict fields, '
+                f'not `{field_name}`')
+        if field_name in indexed_fields:
+            raise ConfigurationError(
+                f'`{entity_cls.__name__}` cannot compress `{field_name}`, as it is indexed')
+        if codec not in CODECS:
+            raise ConfigurationError(
+                f'`{entity_cls.__name__}` has an unknown compression codec `{codec}`. '
+                f'Choose one of {", ".join(CODECS)}')
+    return field_names
+
+
+def case_insensitive_fields(entity_cls):
+    """Return the names of the fields an entity looks up case-insensitively"""
+    meta = getattr(entity_cls, 'Meta', None)
+    field_names = getattr(meta, 'case_insensitive_fields', None) or ()
+    if isinstance(field_names, str):
+        field_names = (field_names, )
+
+    for field_name in field_names:
+        field_obj = entity_cls.meta_.declared_fields.get(field_name)
+        if not isinstance(field_obj, (field.String, field.Text)):
+            raise ConfigurationError(
+                f'`{entity_cls.__name__}` can only look up String or Text fields '
+                f'case-insensitively, not `{field_name}`')
+    return tuple(field_names)
+
 
 class DeclarativeMeta(sa_dec.DeclarativeMeta, ABCMeta):
     """ Metaclass for the Sqlalchemy declarative schema """
@@ -26,15 +99,62 @@ class DeclarativeMeta(sa_dec.DeclarativeMeta, ABCMeta):
         field.DateTime: sa_types.DateTime,
     }
 
+    def column_type(cls, entity_cls, field_name, field_obj):
+        """Return the SA type of a field's column, as narrow as the field's values allow
+
+        * UUIDs in `uuid_fields` are stored in 16 bytes
+        * Fields in `compressed_fields` are stored compressed
+        * String choices get an enum type, native on Postgres and checked elsewhere
+        * Integers get the narrowest type holding their choices or bounds
+        * Unmapped field types are stored as strings
+        """
+        field_cls = type(field_obj)
+        if field_name in uuid_fields(entity_cls):
+            return GUID()
+
+        codec = compressed_fields(entity_cls).get(field_name)
+        if codec is not None:
+            return Compressed(
+                pickled=field_cls != field.Text, codec=codec,
+                threshold=getattr(entity_cls.Meta, 'compression_threshold', 256))
+
+        choices = list(field_obj.choice_dict) if field_obj.choices else None
+        if issubclass(field_cls, field.String):
+            if choices and all(isinstance(choice, str) for choice in choices):
+                return sa_types.Enum(
+                    *choices, name=f'{entity_cls.meta_.schema_name}_{field_name}')
+            return sa_types.String(length=field_obj.max_length)
+
+        if field_cls == field.Integer:
+            if choices and all(isinstance(choice, int) for choice in choices):
+                return integer_type(min(choices), max(choices))()
+            return integer_type(field_obj.min_value, field_obj.max_value)()
+
+        # Get the SA type and default to the text type if no mapping is found
+        return cls.field_mapping.get(field_cls, sa_types.String)()
+
     def __init__(cls, classname, bases, dict_):
         # Update the class attrs with the entity attributes
         if hasattr(cls, 'entity_cls'):
             entity_cls = cls.entity_cls
+
+            # Partitioned tables are native on Postgres, where the partition field becomes
+            #   part of the primary key. Other databases get a regular table, with an index on
+            #   the partition field for range lookups.
+            partitioning = partition_options(entity_cls)
+            native_partitioning = (
+                partitioning is not None and cls.metadata.bind is not None and
+                cls.metadata.bind.dialect.name == 'postgresql')
+            if native_partitioning:
+                cls.__table_args__ = {
+                    'postgresql_partition_by': f'RANGE ({partitioning.field_name})'}
+
             for field_name, field_obj in entity_cls.meta_.declared_fields.items():
 
                 # Map the field if not in attributes
                 if field_name not in cls.__dict__:
                     field_cls = type(field_obj)
+                    type_entity, type_field_name, type_field = entity_cls, field_name, field_obj
                     if field_cls == field.Reference:
                         related_ent = repo_factory.get_entity(field_obj.to_cls.__name__)
                         if field_obj.via:
@@ -45,11 +165,9 @@ class DeclarativeMeta(sa_dec.DeclarativeMeta, ABCMeta):
                         field_name = field_obj.get_attribute_name()
                         field_cls = type(related_attr)
 
-                    # Get the SA type and default to the text type if no
-                    # mapping is found
-                    sa_type_cls = cls.field_mapping.get(field_cls)
-                    if not sa_type_cls:
-                        sa_type_cls = sa_types.String
+                        # References are stored like the field they refer to
+                        type_entity, type_field_name, type_field = \
+                            related_ent, related_attr.field_name, related_attr
 
                     # Build the column arguments
                     col_args = {
@@ -57,13 +175,31 @@ class DeclarativeMeta(sa_dec.DeclarativeMeta, ABCMeta):
                         'nullable': not field_obj.required,
                         'unique': field_obj.unique
                     }
-
-                    # Update the arguments based on the field type
-                    type_args = {}
-                    if issubclass(field_cls, field.String):
-                        type_args['length'] = field_obj.max_length
+                    if native_partitioning:
+                        # Unique constraints on partitioned tables must include the partition
+                        #   field, so uniqueness is left to the entity's validations
+                        col_args['unique'] = False
+                    if partitioning and field_name == partitioning.field_name:
+                        if native_partitioning:
+                            col_args['primary_key'] = True
+                        else:
+                            col_args['index'] = True
+                    elif native_partitioning and field_cls == field.Auto:
+                        # Identifiers are still generated within a composite primary key
+                        col_args['autoincrement'] = True
 
                     # Update the attributes of the class
-                    setattr(cls, field_name,
-                            Column(sa_type_cls(**type_args), **col_args))
+                    setattr(cls, field_name, Column(
+                        cls.column_type(type_entity, type_field_name, type_field), **col_args))
         super().__init__(classname, bases, dict_)
+
+        if hasattr(cls, 'entity_cls'):
+            # Index case-insensitive fields on `lower(field)`, which `iexact` lookups compare
+            for field_name in case_insensitive_fields(cls.entity_cls):
+                Index(f'ix_{cls.__table__.name}_{field_name}_lower',
+                      func.lower(cls.__table__.c[field_name]))
+
+            # Maintain the full-text index of searchable fields along with the table
+            searching = search_options(cls.entity_cls)
+            if searching is not None:
+                index_search_fields(cls.__table__, searching)
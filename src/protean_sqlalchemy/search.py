@@ -0,0 +1,181 @@
+"""Module to index text fields of entities for full-text search
+
+An entity's text fields are indexed by declaring them, and optionally the Postgres text search
+configuration, in its ``Meta`` options::
+
+    class Note(Entity):
+        title = field.String(max_length=100)
+        body = field.Text()
+
+        class Meta:
+            search_fields = ('title', 'body')
+            search_config = 'english'
+
+SQLite keeps an FTS5 table in sync with the entity's table through triggers, and Postgres keeps
+a generated ``tsvector`` column with a GIN index. The ``search`` lookup matches entities whose
+indexed fields contain all the words of the search text, and results can be ordered by
+relevance with ``order_by('-search_rank')``.
+"""
+from collections import namedtuple
+
+from protean.core import field
+from protean.core.exceptions import ConfigurationError
+
+# Name used in `order_by` to sort results by relevance to the search text
+SEARCH_RANK = 'search_rank'
+
+# Name of the generated column holding the search document on Postgres
+SEARCH_VECTOR = 'search_vector'
+
+# Full-text search options of an entity
+SearchOptions = namedtuple('SearchOptions', 'field_names, config')
+
+
+def search_options(entity_cls):
+    """Return the full-text search options of an entity, or None if it has no search fields"""
+    meta = getattr(entity_cls, 'Meta', None)
+    field_names = getattr(meta, 'search_fields', None)
+    if not field_names:
+        return None
+
+    if isinstance(field_names, str):
+        field_names = (field_names, )
+    for field_name in field_names:
+        field_obj = entity_cls.meta_.declared_fields.get(field_name)
+        if not isinstance(field_obj, (field.String, field.Text)):
+            raise ConfigurationError(
+                f'`{entity_cls.__name__}` can only search String or Text fields, '
+                f'not `{field_name}`')
+
+    return SearchOptions(
+        field_names=tuple(field_names),
+        config=getattr(meta, 'search_config', 'english'))
+
+
+def quote(name: str) -> str:
+    """Quote an identifier, for both SQLite and Postgres"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def fts_table_name(table_name: str) -> str:
+    """Return the name of the FTS5 table indexing a SQLite table"""
+    return f'{table_name}_fts'
+
+
+def fts5_query(text: str) -> str:
+    """Convert search text to an FTS5 query matching all of its words
+
+    Each word is quoted, so that punctuation and FTS5 operators in the text are searched for
+    literally rather than interpreted.
+    """
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+def sqlite_ddl(table_name: str, options: SearchOptions):
+    """Return the statements creating the FTS5 table of a SQLite table, and the triggers
+    keeping it in sync"""
+    fts = quote(fts_table_name(table_name))
+    table = quote(table_name)
+    columns = ', '.join(quote(name) for name in options.field_names)
+
+    def values(prefix):
+        return ', '.join(f'{prefix}.{quote(name)}' for name in options.field_names)
+
+    insert = f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {values("new")});'
+    delete = (f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+              f"VALUES ('delete', old.rowid, {values('old')});")
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5("
+        f"{columns}, content='{table_name.replace(chr(39), chr(39) * 2)}')",
+        f'CREATE TRIGGER {quote(table_name + "_fts_insert")} AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER {quote(table_name + "_fts_delete")} AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER {quote(table_name + "_fts_update")} AFTER UPDATE ON {table} '
+        f'BEGIN {delete} {insert} END',
+    ]
+
+
+def postgres_ddl(table_name: str, options: SearchOptions):
+    """Return the statements adding the generated search column of a Postgres table, and
+    its GIN index"""
+    document = " || ' ' || ".join(
+        f"coalesce({quote(name)}, '')" for name in options.field_names)
+    return [
+        f'ALTER TABLE {quote(table_name)} ADD COLUMN {SEARCH_VECTOR} tsvector '
+        f"GENERATED ALWAYS AS (to_tsvector('{options.config}', {document})) STORED",
+        f'CREATE INDEX {quote(table_name + "_search_idx")} ON {quote(table_name)} '
+        f'USING GIN ({SEARCH_VECTOR})',
+    ]
+
+
+def index_search_fields(table, options: SearchOptions):
+    """Create the full-text index of a table along with the table, on SQLite and Postgres"""
+    from sqlalchemy import DDL
+    from sqlalchemy import event
+
+    for statement in sqlite_ddl(table.name, options):
+        event.listen(table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+    event.listen(table, 'before_drop', DDL(
+        f'DROP TABLE IF EXISTS {quote(fts_table_name(table.name))}').execute_if(dialect='sqlite'))
+
+    for statement in postgres_ddl(table.name, options):
+        event.listen(table, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+
+
+def fts_match(table, text: str):
+    """Return the FTS5 table of a SQLite table, and the condition matching its rows to `text`"""
+    from sqlalchemy import String
+    from sqlalchemy import bindparam
+    from sqlalchemy import column
+    from sqlalchemy import literal_column
+    from sqlalchemy.sql import table as table_clause
+
+    name = fts_table_name(table.name)
+    fts = table_clause(name, column('rowid'))
+    condition = literal_column(quote(name)).op('MATCH')(
+        bindparam(None, fts5_query(text), type_=String))
+    return fts, condition
+
+
+def search_expression(table, options: SearchOptions, text: str, dialect):
+    """Return the expression matching rows whose indexed fields contain all words of `text`
+
+    Dialects without full-text indexes fall back to case-insensitive `LIKE` comparisons.
+    """
+    from sqlalchemy import and_
+    from sqlalchemy import func
+    from sqlalchemy import literal_column
+    from sqlalchemy import or_
+    from sqlalchemy import select
+
+    if dialect.name == 'sqlite':
+        fts, condition = fts_match(table, text)
+        return literal_column(f'{quote(table.name)}.rowid').in_(
+            select([fts.c.rowid]).where(condition))
+    elif dialect.name == 'postgresql':
+        return literal_column(f'{quote(table.name)}.{SEARCH_VECTOR}').op('@@')(
+            func.plainto_tsquery(options.config, text))
+    else:
+        return and_(*[
+            or_(*[table.c[name].ilike(f'%{word}%') for name in options.field_names])
+            for word in text.split()])
+
+
+def rank_expression(table, options: SearchOptions, text: str, dialect):
+    """Return the relevance of rows to `text`, higher for more relevant rows, or None if the
+    dialect cannot rank rows"""
+    from sqlalchemy import func
+    from sqlalchemy import literal_column
+    from sqlalchemy import select
+
+    if dialect.name == 'sqlite':
+        # bm25 scores are lower for more relevant rows
+        fts, condition = fts_match(table, text)
+        return select([-func.bm25(literal_column(quote(fts.name)))]).where(condition).where(
+            fts.c.rowid == literal_column(f'{quote(table.name)}.rowid')).as_scalar()
+    elif dialect.name == 'postgresql':
+        return func.ts_rank(
+            literal_column(f'{quote(table.name)}.{SEARCH_VECTOR}'),
+            func.plainto_tsquery(options.config, text))
+    return None
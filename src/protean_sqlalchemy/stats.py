@@ -0,0 +1,81 @@
+"""Module to report table sizes, row counts and index usage of a provider's database"""
+from collections import namedtuple
+
+# Statistics of a table:
+#   * `rows`: Number of rows, estimated from the planner's statistics on Postgres
+#   * `size`: Bytes used by the table, along with its indexes on Postgres, if known
+#   * `indexes`: Statistics of the table's indexes
+TableStats = namedtuple('TableStats', 'name, rows, size, indexes')
+
+# Statistics of an index:
+#   * `size`: Bytes used by the index, if known
+#   * `scans`: Number of scans that used the index, if tracked by the database
+IndexStats = namedtuple('IndexStats', 'name, size, scans')
+
+
+def table_stats(provider) -> list:
+    """Return statistics of each table in the provider's database"""
+    from sqlalchemy import inspect
+
+    engine = provider._engine
+    dialect_name = engine.dialect.name
+    if dialect_name == 'postgresql':
+        return _postgres_stats(engine)
+
+    if dialect_name == 'sqlite':
+        # Read indexes from the schema, as reflection skips indexes on expressions
+        sizes = _sqlite_sizes(engine)
+        index_names = {}
+        for table_name, index_name in engine.execute(
+                "SELECT tbl_name, name FROM sqlite_master WHERE type = 'index' ORDER BY name"):
+            index_names.setdefault(table_name, []).append(index_name)
+    else:
+        sizes = {}
+        index_names = None
+
+    inspector = inspect(engine)
+    stats = []
+    for table_name in inspector.get_table_names():
+        if index_names is None:
+            names = [index['name'] for index in inspector.get_indexes(table_name)]
+        else:
+            names = index_names.get(table_name, [])
+        quoted = engine.dialect.identifier_preparer.quote(table_name)
+        stats.append(TableStats(
+            name=table_name,
+            rows=engine.execute(f'SELECT count(*) FROM {quoted}').scalar(),
+            size=sizes.get(table_name),
+            indexes=[IndexStats(name=name, size=sizes.get(name), scans=None) for name in names]))
+    return stats
+
+
+def _sqlite_sizes(engine) -> dict:
+    """Return the bytes used by each table and index, if SQLite was built with `dbstat`"""
+    from sqlalchemy.exc import OperationalError
+
+    try:
+        rows = engine.execute('SELECT name, sum(pgsize) FROM dbstat GROUP BY name').fetchall()
+    except OperationalError:
+        return {}
+    return {name: size for name, size in rows}
+
+
+def _postgres_stats(engine) -> list:
+    """Return table statistics from Postgres' statistics views"""
+    indexes = {}
+    for table_name, index_name, size, scans in engine.execute(
+            'SELECT relname, indexrelname, pg_relation_size(indexrelid), idx_scan '
+            'FROM pg_stat_user_indexes ORDER BY indexrelname'):
+        indexes.setdefault(table_name, []).append(
+            IndexStats(name=index_name, size=size, scans=scans))
+
+    return [
+        TableStats(name=table_name, rows=rows, size=size, indexes=indexes.get(table_name, []))
+        for table_name, rows, size in engine.execute(
+            'SELECT relname, n_live_tup, pg_total_relation_size(relid) '
+            'FROM pg_stat_user_tables ORDER BY relname')]
+
+
+def pool_status(provider) -> str:
+    """Return the status of the provider's connection pool"""
+    return provider._engine.pool.status()
@@ -0,0 +1,56 @@
+"""Module to enforce time budgets on statements run by repositories"""
+import time
+from contextlib import contextmanager
+
+from sqlalchemy.exc import OperationalError
+
+# Number of SQLite virtual machine instructions between checks of the deadline
+SQLITE_PROGRESS_STEPS = 1000
+
+# Postgres error code raised when a statement is cancelled because of `statement_timeout`
+POSTGRES_QUERY_CANCELED = '57014'
+
+
+class StatementTimeoutError(OperationalError):
+    """Raised when a statement is cancelled for running longer than its time budget"""
+
+
+@contextmanager
+def statement_timeout(session, timeout: float = None):
+    """Cancel statements run on the session within the block after `timeout` seconds
+
+    SQLite statements are interrupted by a progress handler, and Postgres statements are
+    limited with a transaction-local `statement_timeout`. Timeouts are not enforced on other
+    dialects. Cancelled statements raise :class:`StatementTimeoutError`.
+    """
+    if timeout is None:
+        yield
+        return
+
+    connection = session.connection()
+    dialect_name = connection.dialect.name
+
+    if dialect_name == 'sqlite':
+        dbapi_connection = connection.connection.connection
+        deadline = time.monotonic() + timeout
+        dbapi_connection.set_progress_handler(
+            lambda: time.monotonic() > deadline, SQLITE_PROGRESS_STEPS)
+        try:
+            yield
+        except OperationalError as exc:
+            if 'interrupted' in str(exc.orig):
+                raise StatementTimeoutError(exc.statement, exc.params, exc.orig) from exc
+            raise
+        finally:
+            dbapi_connection.set_progress_handler(None, SQLITE_PROGRESS_STEPS)
+    elif dialect_name == 'postgresql':
+        connection.execute(f'SET LOCAL statement_timeout = {int(timeout * 1000)}')
+        try:
+            yield
+        except OperationalError as exc:
+            if getattr(exc.orig, 'pgcode', None) == POSTGRES_QUERY_CANCELED:
+                raise StatementTimeoutError(exc.statement, exc.params, exc.orig) from exc
+            raise
+        connection.execute('SET LOCAL statement_timeout = DEFAULT')
+    else:
+        yield
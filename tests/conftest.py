@@ -15,13 +15,19 @@ def register_models():
     from protean.core.repository import repo_factory
     from protean.core.provider import providers
 
+    from tests.support.audit import AuditLog
     from tests.support.dog import Dog, RelatedDog
     from tests.support.human import Human, RelatedHuman
+    from tests.support.note import Note
+    from tests.support.ticket import Ticket
 
+    repo_factory.register(AuditLog)
     repo_factory.register(Dog)
     repo_factory.register(RelatedDog)
     repo_factory.register(Human)
     repo_factory.register(RelatedHuman)
+    repo_factory.register(Note)
+    repo_factory.register(Ticket)
 
     for entity_name in repo_factory._registry:
         repo_factory.get_repository(repo_factory._registry[entity_name].entity_cls)
@@ -41,15 +47,44 @@ def run_around_tests():
     """Truncate data after each test run"""
     from protean.core.repository import repo_factory
 
+    from tests.support.audit import AuditLog
     from tests.support.dog import Dog, RelatedDog
     from tests.support.human import Human, RelatedHuman
+    from tests.support.note import Note
+    from tests.support.ticket import Ticket
 
     # A test function will be run at this point
     yield
 
     # Truncate tables
     #   FIXME We are deleting records here, but TRUNCATE is typically much faster
+    repo_factory.get_repository(AuditLog).delete_all()
     repo_factory.get_repository(Dog).delete_all()
     repo_factory.get_repository(RelatedDog).delete_all()
     repo_factory.get_repository(Human).delete_all()
     repo_factory.get_repository(RelatedHuman).delete_all()
+    repo_factory.get_repository(Note).delete_all()
+    repo_factory.get_repository(Ticket).delete_all()
+
+
+@pytest.fixture(scope='function')
+def provider():
+    """Return the default provider, which stores the test entities"""
+    from protean.core.provider import providers
+
+    return providers.get_provider()
+
+
+@pytest.fixture(scope='function')
+def statements(provider):
+    """Record the statements sent to the default provider's database during the test"""
+    from sqlalchemy import event
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(provider._engine, 'before_cursor_execute', record)
+    yield statements
+    event.remove(provider._engine, 'before_cursor_execute', record)
@@ -0,0 +1,18 @@
+""" Define entities of the Audit Type """
+from datetime import datetime
+
+from protean.core import field
+from protean.core.entity import Entity
+
+
+class AuditLog(Entity):
+    """This is a dummy Audit Log Entity class, partitioned by month"""
+    message = field.Text(required=True)
+    created_at = field.DateTime(default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<AuditLog id={self.id}>'
+
+    class Meta:
+        partition_by = 'created_at'
+        partition_interval = 'month'
@@ -23,6 +23,7 @@ class Human(Entity):
 
     class Meta:
         provider = 'another_db'
+        case_insensitive_fields = ('name', )
 
 
 class RelatedHuman(Entity):
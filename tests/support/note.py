@@ -0,0 +1,16 @@
+""" Define entities of the Note Type """
+from protean.core import field
+from protean.core.entity import Entity
+
+
+class Note(Entity):
+    """This is a dummy Note Entity class, with full-text search on its title and body"""
+    title = field.String(required=True, max_length=100)
+    body = field.Text()
+    author = field.String(max_length=50)
+
+    def __repr__(self):
+        return f'<Note id={self.id}>'
+
+    class Meta:
+        search_fields = ('title', 'body')
@@ -0,0 +1,39 @@
+""" Define entities of the Ticket Type """
+import enum
+from uuid import uuid4
+
+from protean.core import field
+from protean.core.entity import Entity
+
+
+class TicketStatus(enum.Enum):
+    """Statuses of a ticket"""
+    OPEN = 'open'
+    CLOSED = 'closed'
+
+
+class TicketPriority(enum.Enum):
+    """Priorities of a ticket"""
+    LOW = 1
+    HIGH = 2
+
+
+class Ticket(Entity):
+    """This is a dummy Ticket Entity class, with compactly stored fields"""
+    id = field.String(identifier=True, max_length=36, default=lambda: str(uuid4()))
+    title = field.String(required=True, max_length=100)
+    status = field.String(max_length=10, choices=TicketStatus, default='open')
+    priority = field.Integer(choices=TicketPriority, default=1)
+    comments = field.Integer(min_value=0, max_value=1000)
+    views = field.Integer(min_value=0, max_value=10 ** 12)
+    progress = field.Integer(min_value=0, max_value=100)
+    description = field.Text()
+    history = field.List()
+
+    def __repr__(self):
+        return f'<Ticket id={self.id}>'
+
+    class Meta:
+        uuid_fields = ('id', )
+        compressed_fields = {'description': 'lzma', 'history': 'zlib'}
+        compression_threshold = 64
@@ -0,0 +1,134 @@
+"""Module to test buffered writes of entities from a background thread"""
+import threading
+import time
+
+import pytest
+from protean.core.exceptions import ValidationError
+
+from protean_sqlalchemy.buffer import WriteBuffer
+from protean_sqlalchemy.buffer import WriteBufferFullError
+from protean_sqlalchemy.provider import SAProvider
+
+from .support.dog import Dog
+from .support.human import Human
+
+
+class TestWriteBuffer:
+    """Class to test the write buffer"""
+
+    def wait_for(self, condition, timeout=5):
+        """Wait until the background thread has met a condition"""
+        deadline = time.monotonic() + timeout
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return condition()
+
+    def test_full_batch_written(self, provider):
+        """Test that a batch is written as soon as it is full"""
+        buffer = WriteBuffer(provider, batch_size=5, flush_interval=60)
+        for index in range(12):
+            buffer.add(Dog(name=f'Dog {index}', owner='John', age=index))
+
+        assert self.wait_for(lambda: buffer.written == 10)
+        assert len(buffer) == 2
+        assert Dog.query.all().total == 10
+
+        buffer.close()
+        assert buffer.written == 12
+        assert Dog.query.all().total == 12
+
+    def test_batch_written_after_interval(self, provider):
+        """Test that queued entities are written once the oldest has waited long enough"""
+        buffer = WriteBuffer(provider, batch_size=100, flush_interval=0.05)
+        buffer.add(Dog(name='Johnny', owner='John'))
+
+        assert self.wait_for(lambda: buffer.written == 1)
+        assert Dog.query.filter(name='Johnny').first.owner == 'John'
+        buffer.close()
+
+    def test_flush(self, provider):
+        """Test that entities are written on demand"""
+        buffer = WriteBuffer(provider, batch_size=100, flush_interval=60)
+        buffer.add(Dog(name='Johnny', owner='John'))
+        buffer.add(Dog(name='Cash', owner='John'))
+
+        buffer.flush()
+        assert len(buffer) == 0
+        assert Dog.query.all().total == 2
+        buffer.close()
+
+    def test_entities_validated_when_built(self, provider):
+        """Test that invalid entities never reach the buffer"""
+        buffer = WriteBuffer(provider)
+        with pytest.raises(ValidationError):
+            buffer.add(Dog(owner='John'))
+        buffer.close()
+
+    def test_entities_of_other_databases_rejected(self, provider):
+        """Test that entities must be stored in the buffer's database"""
+        buffer = WriteBuffer(provider)
+        with pytest.raises(ValueError):
+            buffer.add(Human(name='John', date_of_birth='1990-01-01'))
+
+    def test_backpressure(self, provider):
+        """Test that adding to a full buffer blocks, and fails after the timeout"""
+        buffer = WriteBuffer(provider, batch_size=2, max_pending=2, timeout=0.05)
+
+        # Hold the write lock, so that the buffer cannot drain
+        buffer._write_lock.acquire()
+        try:
+            buffer.add(Dog(name='Dog 1', owner='John'))
+            buffer.add(Dog(name='Dog 2', owner='John'))
+
+            with pytest.raises(WriteBufferFullError):
+                buffer.add(Dog(name='Dog 3', owner='John'))
+        finally:
+            buffer._write_lock.release()
+
+        # Writers are unblocked as batches are written
+        buffer.timeout = 5
+        buffer.add(Dog(name='Dog 3', owner='John'))
+        buffer.close()
+        assert Dog.query.all().total == 3
+
+    def test_error_callbacks(self, provider):
+        """Test that failed batches are reported to the error callbacks"""
+        buffer = WriteBuffer(provider, batch_size=2, flush_interval=60)
+        errors = []
+        reported = threading.Event()
+
+        @buffer.on_error
+        def report(error, entities):
+            errors.append((error, [entity.name for entity in entities]))
+            reported.set()
+
+        # Names of dogs are unique
+        buffer.add(Dog(name='Johnny', owner='John'))
+        buffer.add(Dog(name='Johnny', owner='Jane'))
+
+        assert reported.wait(5)
+        assert errors[0][1] == ['Johnny', 'Johnny']
+        assert buffer.failed == 2
+        assert Dog.query.all().total == 0
+
+        buffer.add(Dog(name='Cash', owner='John'))
+        buffer.close()
+        assert buffer.written == 1
+
+    def test_closed_buffer(self, provider):
+        """Test that closed buffers accept no more entities"""
+        buffer = WriteBuffer(provider)
+        buffer.close()
+        with pytest.raises(RuntimeError):
+            buffer.add(Dog(name='Johnny', owner='John'))
+
+    def test_configured_buffer(self):
+        """Test that the provider's buffer is configured with the `WRITE_BUFFER` key"""
+        provider = SAProvider({
+            'DATABASE_URI': 'sqlite://',
+            'WRITE_BUFFER': {'BATCH_SIZE': 50, 'FLUSH_INTERVAL': 0.5, 'MAX_PENDING': 100}})
+
+        assert provider.write_buffer.batch_size == 50
+        assert provider.write_buffer.flush_interval == 0.5
+        assert provider.write_buffer.max_pending == 100
+        assert SAProvider({'DATABASE_URI': 'sqlite://'}).write_buffer is None
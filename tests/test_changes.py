@@ -0,0 +1,123 @@
+"""Module to test capture of changes committed through repositories"""
+import json
+
+import pytest
+from protean.core.provider import providers
+from sqlalchemy import MetaData
+
+from protean_sqlalchemy.changes import outbox_table
+
+from .support.dog import Dog
+
+
+class TestChangeSubscribers:
+    """Class to test delivery of committed changes to subscribers"""
+
+    @pytest.fixture(scope='function')
+    def batches(self, provider):
+        """Subscribe to changes for the duration of a test"""
+        batches = []
+        provider.subscribe(batches.append)
+        yield batches
+        provider.unsubscribe(batches.append)
+
+    def test_changes_published_after_each_commit(self, batches):
+        """Test that each repository write outside a transaction is published on commit"""
+        dog = Dog.create(name='Cash', owner='John', age=10)
+        dog.update(age=11)
+        Dog.query.filter(owner='John').update_all(age=12)
+        Dog.query.filter(owner='John').delete_all()
+
+        operations = [[change.operation for change in batch] for batch in batches]
+        assert operations == [['create'], ['update'], ['update_all'], ['delete_all']]
+
+        create, update, update_all, delete_all = [batch[0] for batch in batches]
+        assert create.entity_name == 'Dog'
+        assert create.identifiers == [dog.id]
+        assert create.changes['name'] == 'Cash'
+        assert update.changes == {'age': 11}
+        assert update_all.identifiers == [dog.id]
+        assert update_all.changes == {'age': 12}
+        assert delete_all.identifiers == [dog.id]
+        assert delete_all.changes == {}
+
+    def test_transaction_published_as_one_batch(self, provider, batches):
+        """Test that changes are published once, after the transaction commits"""
+        with provider.transaction():
+            Dog.create(name='Cash', owner='John', age=10)
+
+            with pytest.raises(ValueError):
+                with provider.transaction():
+                    Dog.create(name='Boxy', owner='Carry', age=4)
+                    raise ValueError('Abort')
+
+            Dog.create(name='Gooey', owner='John', age=2)
+            assert batches == []
+
+        assert len(batches) == 1
+        assert [change.changes['name'] for change in batches[0]] == ['Cash', 'Gooey']
+
+    def test_rolled_back_changes_not_published(self, provider, batches):
+        """Test that nothing is published for a transaction that is rolled back"""
+        with pytest.raises(ValueError):
+            with provider.transaction():
+                Dog.create(name='Cash', owner='John', age=10)
+                raise ValueError('Abort')
+
+        Dog.create(name='Boxy', owner='Carry', age=4)
+        assert len(batches) == 1
+        assert batches[0][0].changes['name'] == 'Boxy'
+
+    def test_failing_subscriber(self, provider, batches):
+        """Test that a failing subscriber does not affect the write or other subscribers"""
+        def fail(changes):
+            raise RuntimeError('Subscriber failed')
+
+        provider.subscribe(fail)
+        try:
+            dog = Dog.create(name='Cash', owner='John', age=10)
+        finally:
+            provider.unsubscribe(fail)
+
+        assert Dog.get(dog.id).name == 'Cash'
+        assert len(batches) == 1
+
+
+class TestChangeOutbox:
+    """Class to test writing changes to an outbox table"""
+
+    @pytest.fixture(scope='function')
+    def outbox(self):
+        """Write changes to an outbox table for the duration of a test"""
+        provider = providers.get_provider()
+        outbox = outbox_table('change_outbox', MetaData())
+        outbox.create(provider._engine)
+        provider.outbox = outbox
+        yield outbox
+        provider.outbox = None
+        outbox.drop(provider._engine)
+
+    def outbox_rows(self, outbox):
+        """Return the rows of the outbox table"""
+        engine = providers.get_provider()._engine
+        return engine.execute(outbox.select().order_by(outbox.c.id)).fetchall()
+
+    def test_changes_written_to_outbox(self, outbox):
+        """Test that each write adds a row to the outbox"""
+        dog = Dog.create(name='Cash', owner='John', age=10)
+        dog.delete()
+
+        rows = self.outbox_rows(outbox)
+        assert [row.operation for row in rows] == ['create', 'delete']
+        assert json.loads(rows[0].identifiers) == [dog.id]
+        assert json.loads(rows[0].changes)['owner'] == 'John'
+        assert rows[0].created_at is not None
+
+    def test_outbox_rolled_back_with_transaction(self, outbox):
+        """Test that outbox rows are rolled back along with the writes"""
+        with pytest.raises(ValueError):
+            with providers.get_provider().transaction():
+                Dog.create(name='Cash', owner='John', age=10)
+                raise ValueError('Abort')
+
+        assert self.outbox_rows(outbox) == []
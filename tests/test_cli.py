@@ -0,0 +1,88 @@
+"""Module to test the operational commands of the command line app"""
+import pytest
+from click.testing import CliRunner
+
+from protean_sqlalchemy.cli import main
+
+from .support.dog import Dog
+
+
+class TestOperationalCommands:
+    """Class to test the bench, explain and stats commands"""
+
+    def test_bench(self):
+        """Test benchmarking CRUD operations with each number of threads"""
+        result = CliRunner().invoke(main, [
+            'bench', 'tests.support.dog.Dog',
+            '--values', '{"name": "Dog {index}", "owner": "John", "age": 10}',
+            '--operations', '10', '--threads', '1,2', '--memory', '--count', '5'])
+
+        assert result.exit_code == 0, result.output
+        assert '1 threads: 10 operations' in result.output
+        assert '2 threads: 10 operations' in result.output
+        assert '0 errors, 0 leaked connections' in result.output
+        assert 'create: 5 calls' in result.output
+        assert Dog.query.all().total == 0
+
+    def test_explain(self):
+        """Test printing the SQL and query plan of criteria"""
+        result = CliRunner().invoke(main, [
+            'explain', 'tests.support.dog.Dog', '{"owner": "John"}', '--order-by', '-age'])
+
+        assert result.exit_code == 0, result.output
+        assert 'FROM dog' in result.output
+        assert 'ORDER BY dog.age DESC' in result.output
+        assert 'SCAN' in result.output
+        assert 'Warning: the query scans the full table' in result.output
+
+    def test_explain_failure(self, monkeypatch):
+        """Test that a failed EXPLAIN is reported, rather than an earlier plan"""
+        from sqlalchemy.exc import OperationalError
+
+        def fail(conn, statement, dialect):
+            raise OperationalError('EXPLAIN', {}, Exception('Unsupported'))
+
+        CliRunner().invoke(main, ['explain', 'tests.support.dog.Dog', '{"owner": "John"}'])
+        monkeypatch.setattr('protean_sqlalchemy.repository.explain_statement', fail)
+        result = CliRunner().invoke(main, ['explain', 'tests.support.dog.Dog', '{"owner": "Jane"}'])
+
+        assert result.exit_code == 1
+        assert 'Unable to capture the query plan' in result.output
+        assert 'FROM dog' not in result.output
+
+    @pytest.mark.parametrize('arguments, message', [
+        (['owner=John'], 'Invalid value for CRITERIA: Not a valid JSON object'),
+        (['["owner"]'], 'Invalid value for CRITERIA: Not a JSON object of filters'),
+        (['{"nofield": 1}'], 'Invalid value for CRITERIA: `Dog` has no field `nofield`'),
+        (['{"age__near": 1}'], 'Invalid value for CRITERIA: Unknown lookup in `age__near`'),
+        (['{}', '--order-by', '-nofield'], 'Invalid value for --order-by: `Dog` has no field'),
+    ])
+    def test_explain_invalid_criteria(self, arguments, message):
+        """Test that criteria must be a JSON object of filters on fields of the entity"""
+        result = CliRunner().invoke(main, ['explain', 'tests.support.dog.Dog'] + arguments)
+
+        assert result.exit_code == 2
+        assert message in result.output
+        assert 'Traceback' not in result.output
+
+    def test_stats(self):
+        """Test reporting tables, row counts and indexes of a database"""
+        Dog.create(name='Johnny', owner='John', age=2)
+        Dog.create(name='Cash', owner='John', age=4)
+
+        result = CliRunner().invoke(main, ['stats', '--provider', 'default'])
+
+        assert result.exit_code == 0, result.output
+        assert result.output.startswith('default: ')
+        assert '  dog: 2 rows, ' in result.output
+        assert '    ix_audit_log_created_at: ' in result.output
+        assert 'another_db' not in result.output
+
+    def test_stats_of_all_databases(self):
+        """Test that all configured databases are reported by default"""
+        result = CliRunner().invoke(main, ['stats'])
+
+        assert result.exit_code == 0, result.output
+        assert 'default: ' in result.output
+        assert 'another_db: ' in result.output
+        assert '    ix_human_name_lower: ' in result.output
@@ -0,0 +1,146 @@
+"""Module to test the column types fields are mapped to"""
+import zlib
+from uuid import uuid4
+
+import pytest
+from protean.core.exceptions import ConfigurationError
+from protean.core.repository import repo_factory
+from sqlalchemy import MetaData
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from protean_sqlalchemy.column_types import GUID
+from protean_sqlalchemy.column_types import Compressed
+from protean_sqlalchemy.column_types import integer_type
+from protean_sqlalchemy.column_types import register_codec
+from protean_sqlalchemy.provider import In
+from protean_sqlalchemy.repository import SqlalchemyModel
+
+from .support.ticket import Ticket
+
+
+class TestColumnTypes:
+    """Class to test compact column types"""
+
+    @pytest.fixture(scope='function')
+    def table(self):
+        """Return the table of the Ticket entity"""
+        return repo_factory.get_model(Ticket).__table__
+
+    def test_integer_type_from_bounds(self):
+        """Test that the narrowest integer type holding the bounds is chosen"""
+        assert integer_type(0, 100).__name__ == 'SmallInteger'
+        assert integer_type(-40000, 40000).__name__ == 'Integer'
+        assert integer_type(0, 2 ** 40).__name__ == 'BigInteger'
+        assert integer_type(None, 100).__name__ == 'Integer'
+        assert integer_type(None, 2 ** 40).__name__ == 'BigInteger'
+        assert integer_type().__name__ == 'Integer'
+
+    def test_mapped_types(self, table):
+        """Test the column types of the Ticket entity"""
+        assert isinstance(table.c.id.type, GUID)
+        assert table.c.title.type.length == 100
+        assert table.c.status.type.enums == ['open', 'closed']
+        assert type(table.c.priority.type).__name__ == 'SmallInteger'
+        assert type(table.c.comments.type).__name__ == 'SmallInteger'
+        assert type(table.c.views.type).__name__ == 'BigInteger'
+
+    def test_round_trip(self, table):
+        """Test that values are stored compactly and read back as given"""
+        ticket = Ticket.create(title='Broken', status='closed', priority=2, views=2 ** 35)
+
+        loaded = Ticket.get(ticket.id)
+        assert loaded.id == ticket.id
+        assert loaded.status == 'closed'
+        assert loaded.priority == 2
+        assert loaded.views == 2 ** 35
+
+        stored = table.bind.execute(table.select()).first()
+        assert len(stored.id) == 36
+        raw_id = table.bind.execute('SELECT id FROM ticket').scalar()
+        assert len(raw_id) == 16
+
+        assert Ticket.query.filter(id__in=[ticket.id]).total == 1
+
+        # Long lists of binary values are not sent as JSON arrays
+        identifiers = [ticket.id] + [str(uuid4()) for _ in range(In.max_params)]
+        assert Ticket.query.filter(id__in=identifiers).total == 1
+
+    def test_compressed_values(self, table):
+        """Test that large values are stored compressed, and small values as they are"""
+        description = 'The printer is on fire. ' * 100
+        history = [{'status': 'open', 'note': 'Reported'}] * 50
+        ticket = Ticket.create(title='Fire', description=description, history=history)
+        Ticket.create(title='Small', description='Short', history=['open'])
+
+        loaded = Ticket.get(ticket.id)
+        assert loaded.description == description
+        assert loaded.history == history
+        assert Ticket.query.filter(title='Small').first.description == 'Short'
+
+        rows = table.bind.execute(
+            'SELECT title, description, history FROM ticket ORDER BY title').fetchall()
+        assert rows[0].description[:1] == b'x'
+        assert len(rows[0].description) < len(description) / 10
+        assert rows[0].history[:1] == b'z'
+        assert rows[1].description == b'\x00Short'
+
+    def test_compressed_codecs(self):
+        """Test that values remain readable after the codec of a column changes"""
+        zlib_type = Compressed(codec='zlib', threshold=0)
+        lzma_type = Compressed(codec='lzma', threshold=0)
+
+        stored = zlib_type.process_bind_param('Hello ' * 10, None)
+        assert lzma_type.process_result_value(stored, None) == 'Hello ' * 10
+
+        with pytest.raises(ValueError):
+            Compressed(codec='brotli')
+        with pytest.raises(ValueError):
+            register_codec('zlib2', b'z', zlib.compress, zlib.decompress)
+
+        # Values compressed by an unregistered codec are reported by their tag
+        with pytest.raises(ValueError, match="b'q'"):
+            zlib_type.process_result_value(b'q' + stored[1:], None)
+
+    def test_compressed_lookups(self, table):
+        """Test that lookups on compressed values are refused, except on nulls"""
+        Ticket.create(title='Hello', description='hello world')
+        Ticket.create(title='Blank')
+
+        with pytest.raises(ConfigurationError):
+            Ticket.query.filter(description__contains='hello').total
+        with pytest.raises(ConfigurationError):
+            Ticket.query.filter(description='hello world').total
+        assert Ticket.query.filter(description=None).first.title == 'Blank'
+
+    def test_postgres_types(self):
+        """Test that UUIDs and choices use native types on Postgres"""
+        engine = create_engine('postgresql://', strategy='mock', executor=lambda *args: None)
+        model_cls = type('PostgresTicketModel', (SqlalchemyModel, ), {
+            'entity_cls': Ticket,
+            'metadata': MetaData(bind=engine)})
+
+        ddl = str(CreateTable(model_cls.__table__).compile(dialect=postgresql.dialect()))
+        assert 'id UUID NOT NULL' in ddl
+        assert 'status ticket_status' in ddl
+        assert 'priority SMALLINT' in ddl
+        assert 'views BIGINT' in ddl
+
+    def test_postgres_in_lookup_on_uuids(self):
+        """Test that long lists of UUIDs are compared against an array of UUIDs on Postgres"""
+        engine = create_engine('postgresql://', strategy='mock', executor=lambda *args: None)
+        model_cls = type('PostgresInTicketModel', (SqlalchemyModel, ), {
+            'entity_cls': Ticket,
+            'metadata': MetaData(bind=engine)})
+        identifiers = [str(uuid4()) for _ in range(In.max_params + 1)]
+
+        compiled = In('id', identifiers, model_cls).as_expression().compile(
+            dialect=postgresql.dialect())
+        assert 'ticket.id = ANY (CAST(%(param_1)s AS UUID[]))' in str(compiled)
+
+        # Values are bound as strings, which the cast converts to UUIDs
+        bind = compiled.binds['param_1']
+        processor = bind.type.bind_processor(postgresql.dialect())
+        values = processor(bind.value) if processor else bind.value
+        assert [str(value) for value in values] == identifiers
@@ -0,0 +1,65 @@
+"""Module to test repositories used concurrently from many threads"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from protean.core.repository import repo_factory
+
+from protean_sqlalchemy.benchmark import concurrency_benchmark
+
+from .support.dog import Dog
+
+
+class TestConcurrency:
+    """Class to test repository calls from a pool of threads"""
+
+    def test_crud_from_many_threads(self):
+        """Test that concurrent writes from many threads are all applied"""
+        def create(index):
+            dog = Dog.create(name=f'Dog {index}', owner='John', age=1)
+            dog.update(age=2)
+            return dog.id
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            identifiers = list(executor.map(create, range(100)))
+
+        assert len(set(identifiers)) == 100
+        assert Dog.query.filter(age=2).total == 100
+
+    def test_sessions_not_shared_between_threads(self):
+        """Test that repositories in different threads never share a session"""
+        sessions = []
+        barrier = threading.Barrier(4)
+
+        def connect():
+            barrier.wait()
+            sessions.append(repo_factory.get_repository(Dog).conn)
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            for future in [executor.submit(connect) for _ in range(4)]:
+                future.result()
+
+        assert len({id(session) for session in sessions}) == 4
+
+    def test_transaction_limited_to_its_thread(self, provider):
+        """Test that repositories in other threads do not join a thread's transaction"""
+        with provider.transaction() as session:
+            Dog.create(name='Cash', owner='John', age=10)
+
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                other = executor.submit(lambda: repo_factory.get_repository(Dog).conn).result()
+
+            assert other is not session
+
+    def test_concurrency_benchmark(self):
+        """Test that the benchmark reports throughput without errors or leaked connections"""
+        results = concurrency_benchmark(
+            Dog, lambda index: {'name': f'Dog {index}', 'owner': 'John', 'age': 10},
+            thread_counts=(1, 4), operations=40)
+
+        assert [result.threads for result in results] == [1, 4]
+        for result in results:
+            assert result.operations == 40
+            assert result.throughput > 0
+            assert result.errors == 0
+            assert result.leaked_connections == 0
+        assert Dog.query.all().total == 0
@@ -0,0 +1,67 @@
+"""Module to test ephemeral in-memory databases, reset from snapshots"""
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from protean.core.exceptions import ConfigurationError
+from protean.core.provider import providers
+
+from protean_sqlalchemy.provider import SAProvider
+from protean_sqlalchemy.repository import SqlalchemyModel
+
+from .support.dog import Dog
+
+
+class TestEphemeralDatabase:
+    """Class to test providers on in-memory SQLite databases"""
+
+    @pytest.fixture(scope='function')
+    def provider(self):
+        """Return a provider on an in-memory database, with the Dog table created"""
+        provider = SAProvider({'DATABASE_URI': 'sqlite://'})
+        type(f'EphemeralDogModel{provider.identifier.replace("-", "")}', (SqlalchemyModel, ), {
+            'entity_cls': Dog,
+            'metadata': provider._metadata})
+        provider._metadata.create_all()
+        return provider
+
+    def count_dogs(self, provider):
+        """Count dogs over a new connection of the provider"""
+        return provider._engine.execute('SELECT count(*) FROM dog').scalar()
+
+    def test_database_shared_by_connections(self, provider):
+        """Test that all connections, from all threads, see the same database"""
+        provider._engine.execute("INSERT INTO dog (name, owner, age) VALUES ('Cash', 'John', 10)")
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            counts = list(executor.map(lambda _: self.count_dogs(provider), range(2)))
+        assert counts == [1, 1]
+
+        # Databases of different providers are separate
+        other = SAProvider({'DATABASE_URI': 'sqlite:///:memory:'})
+        assert other._engine.execute(
+            "SELECT count(*) FROM sqlite_master WHERE name = 'dog'").scalar() == 0
+
+    @pytest.mark.skipif(sys.version_info < (3, 7), reason='SQLite\'s backup API requires Python 3.7')
+    def test_restore_snapshot(self, provider):
+        """Test that restoring the snapshot discards changes made after it was taken"""
+        provider.snapshot()
+
+        provider._engine.execute("INSERT INTO dog (name, owner, age) VALUES ('Cash', 'John', 10)")
+        assert self.count_dogs(provider) == 1
+
+        provider.restore()
+        assert self.count_dogs(provider) == 0
+
+        # The snapshot can be restored again
+        provider._engine.execute("INSERT INTO dog (name, owner, age) VALUES ('Boxy', 'John', 4)")
+        provider.restore()
+        assert self.count_dogs(provider) == 0
+
+    def test_snapshots_need_memory_database(self):
+        """Test that snapshots are refused for databases on disk"""
+        with pytest.raises(ConfigurationError):
+            providers.get_provider().snapshot()
+
+        with pytest.raises(ConfigurationError):
+            SAProvider({'DATABASE_URI': 'sqlite://'}).restore()
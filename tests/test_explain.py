@@ -0,0 +1,65 @@
+"""Module to test capturing query plans of repository queries"""
+import pytest
+from protean.utils.query import Q
+
+from .support.dog import Dog
+
+
+class TestExplain:
+    """Class to test EXPLAIN capture for filter calls"""
+
+    @pytest.fixture(scope='function', autouse=True)
+    def query_plans(self, provider):
+        """Start and end each test without captured plans"""
+        provider.query_plans.clear()
+        yield provider.query_plans
+        provider.query_plans.clear()
+
+    @pytest.fixture(scope='function', autouse=True)
+    def dogs(self):
+        """Create sample dogs in database"""
+        Dog.create(name='Cash', owner='John', age=10)
+        Dog.create(name='Boxy', owner='Carry', age=4)
+
+    def test_no_plans_captured_by_default(self, provider):
+        """Test that plans are only captured when asked for"""
+        Dog.query.filter(owner='John').all()
+        assert len(provider.query_plans) == 0
+
+    @pytest.mark.parametrize('read_only', [False, True])
+    def test_explain_flag(self, provider, read_only):
+        """Test capturing the plan of a full table scan"""
+        repository = provider.get_repository(Dog)
+        repository.filter(Q(owner='John'), read_only=read_only, explain=True)
+
+        query_plan = provider.query_plans[-1]
+        assert query_plan.entity_name == 'Dog'
+        assert query_plan.criteria == ('protean.utils.query.Q', (), {'owner': 'John'})
+        assert query_plan.statement.startswith('SELECT')
+        assert query_plan.duration >= 0
+        assert query_plan.full_scan is True
+
+    def test_index_search_is_not_flagged(self, provider):
+        """Test that plans using an index are not flagged as full scans"""
+        repository = provider.get_repository(Dog)
+        repository.filter(Q(id=1), explain=True)
+        repository.filter(Q(name='Cash'), explain=True)
+
+        assert [plan.full_scan for plan in provider.query_plans] == [False, False]
+
+    def test_slow_query_threshold(self, provider, monkeypatch):
+        """Test that plans are captured for queries slower than the threshold"""
+        monkeypatch.setitem(provider.conn_info, 'EXPLAIN_THRESHOLD', 0)
+        Dog.query.filter(owner='John').all()
+        assert len(provider.query_plans) == 1
+
+        monkeypatch.setitem(provider.conn_info, 'EXPLAIN_THRESHOLD', 60)
+        Dog.query.filter(owner='John').all()
+        assert len(provider.query_plans) == 1
+
+    def test_sampled_queries(self, provider, monkeypatch):
+        """Test that plans are captured for sampled queries"""
+        monkeypatch.setitem(provider.conn_info, 'EXPLAIN_SAMPLE_RATE', 1)
+        Dog.query.filter(owner='John').all()
+        Dog.query.filter(owner='Carry').all()
+        assert len(provider.query_plans) == 2
@@ -2,8 +2,11 @@
 from datetime import datetime
 
 import pytest
+from protean.core.repository import repo_factory
 from protean.utils.query import Q
 
+from protean_sqlalchemy.provider import In
+
 from .support.human import Human
 
 
@@ -29,6 +32,22 @@ class TestFiltersLookups:
         assert filtered_humans is not None
         assert filtered_humans.total == 1
 
+    def test_iexact_lookup_uses_lower_index(self):
+        """ Test that iexact compares lowercase values, using the index on lower(name)"""
+        repo = repo_factory.get_repository(Human)
+        table = repo.model_cls.__table__
+        assert [str(index.expressions[0]) for index in table.indexes] == ['lower(human.name)']
+
+        result = repo.filter(Q(name__iexact='JOHN DOE'), explain=True)
+        assert result.total == 1
+
+        plan = repo.provider.query_plans[-1]
+        assert 'lower(human.name) = lower(?)' in plan.statement
+        assert not plan.full_scan
+
+        # Wildcards are not interpreted
+        assert Human.query.filter(name__iexact='John%').total == 0
+
     def test_contains_lookup(self):
         """ Test the contains lookup of the Adapter """
 
@@ -48,6 +67,11 @@ class TestFiltersLookups:
         assert filtered_humans.total == 1
         assert filtered_humans[0].id == humans[2].id
 
+        # Wildcards in the value are matched literally
+        Human.create(name='100% Human', age='30', weight='13.45', date_of_birth='01-01-1989')
+        assert Human.query.filter(name__icontains='0% h').total == 1
+        assert Human.query.filter(name__icontains='_').total == 0
+
     def test_startswith_lookup(self, humans):
         """ Test the startswith lookup of the Adapter """
 
@@ -118,6 +142,30 @@ class TestFiltersLookups:
         assert filtered_humans.total == 2
         assert filtered_humans[0].id == humans[1].id
 
+    def test_in_lookup_with_large_list(self, humans):
+        """ Test the in lookup with more values than bound parameters allowed """
+        ids = list(range(1000, 41000)) + [humans[1].id, humans[3].id]
+
+        filtered_humans = Human.query.filter(id__in=ids)
+        assert filtered_humans.total == 2
+        assert filtered_humans[0].id == humans[1].id
+
+        filtered_humans = Human.query.exclude(id__in=ids)
+        assert filtered_humans.total == 2
+        assert filtered_humans[0].id == humans[0].id
+
+        names = ['Human %d' % index for index in range(1000)] + ['Jane Doe']
+        filtered_humans = Human.query.filter(name__in=names)
+        assert filtered_humans.total == 1
+        assert filtered_humans[0].id == humans[1].id
+
+    def test_in_lookup_with_large_list_binds_one_parameter(self):
+        """ Test that a large list is passed to the database as a single parameter """
+        model_cls = repo_factory.get_model(Human)
+        lookup = In('id', list(range(In.max_params + 1)), model_cls)
+
+        assert len(lookup.as_expression().compile().params) == 1
+
     def test_date_lookup(self, humans):
         """ Test the lookup of date fields for the Adapter """
 
@@ -0,0 +1,59 @@
+"""Module to test that SQLAlchemy and multiprocessing are imported lazily"""
+import subprocess
+import sys
+
+import pytest
+
+
+def import_profile(module_name):
+    """Import a module in a fresh interpreter and return the ``-X importtime`` log
+
+    The log is returned as a dictionary of module names and their cumulative import time
+    in microseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module_name}'],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+
+    profile = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='`-X importtime` requires Python 3.7')
+class TestLazyImports:
+    """Class to benchmark imports of the package"""
+
+    @pytest.mark.parametrize('module_name', [
+        'protean_sqlalchemy.provider',
+        'protean_sqlalchemy.cli',
+    ])
+    def test_sqlalchemy_is_not_imported(self, module_name):
+        """Test that importing the module does not pull in SQLAlchemy"""
+        profile = import_profile(module_name)
+
+        assert module_name in profile
+        assert [name for name in profile if name.startswith('sqlalchemy')] == []
+
+    @pytest.mark.parametrize('module_name', [
+        'protean_sqlalchemy.provider',
+        'protean_sqlalchemy.cli',
+    ])
+    def test_multiprocessing_is_not_imported(self, module_name):
+        """Test that importing the module does not pull in the process pool of bulk loads"""
+        profile = import_profile(module_name)
+
+        assert module_name in profile
+        assert 'multiprocessing' not in profile
+
+    def test_sqlalchemy_is_imported_on_instantiation(self):
+        """Test that SQLAlchemy is loaded once a provider is initialized"""
+        profile = import_profile(
+            'protean_sqlalchemy.provider as p; '
+            'p.SAProvider({"DATABASE_URI": "sqlite://"})')
+
+        assert 'sqlalchemy.engine' in profile
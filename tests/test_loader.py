@@ -0,0 +1,49 @@
+"""Module to test bulk loading of entities"""
+import json
+
+from click.testing import CliRunner
+
+from protean_sqlalchemy.cli import main
+from protean_sqlalchemy.loader import bulk_load
+
+from .support.dog import Dog
+
+
+class TestBulkLoad:
+    """Class to test the bulk loader"""
+
+    def records(self, count):
+        """Generate records of dogs, without reading them into memory"""
+        for index in range(count):
+            yield {'name': f'Dog {index}', 'owner': f'Owner {index % 3}', 'age': index % 10}
+
+    def test_load_in_process(self):
+        """Test that records are loaded in batches in the current process"""
+        loaded = bulk_load(Dog, self.records(25), processes=1, batch_size=4, commit_interval=2)
+
+        assert loaded == 25
+        assert Dog.query.all().total == 25
+        dog = Dog.query.filter(name='Dog 7').first
+        assert dog.owner == 'Owner 1'
+        assert dog.age == 7
+
+    def test_load_with_process_pool(self):
+        """Test that worker processes load all chunks"""
+        loaded = bulk_load(Dog, self.records(250), processes=2, batch_size=10, commit_interval=2)
+
+        assert loaded == 250
+        assert Dog.query.all().total == 250
+        assert len({dog.id for dog in Dog.query.limit(250).all()}) == 250
+
+    def test_load_command(self, tmpdir):
+        """Test loading a JSON lines file from the command line"""
+        source = tmpdir.join('dogs.jsonl')
+        source.write('\n'.join(json.dumps(record) for record in self.records(12)) + '\n')
+
+        result = CliRunner().invoke(main, [
+            'load', 'tests.support.dog.Dog', str(source),
+            '--processes', '1', '--batch-size', '5'])
+
+        assert result.exit_code == 0, result.output
+        assert 'Loaded 12 records into Dog' in result.output
+        assert Dog.query.all().total == 12
@@ -0,0 +1,126 @@
+"""Module to test iterating over pages of entities"""
+import threading
+import time
+
+import pytest
+from protean.core.provider import providers
+from protean.core.repository import repo_factory
+from protean.utils.query import Q
+
+from protean_sqlalchemy.pagination import prefetched
+
+from .support.dog import Dog
+
+
+class TestPageIterator:
+    """Class to test the keyset page iterator of repositories"""
+
+    @pytest.fixture(scope='function')
+    def repository(self):
+        """Return the repository of dogs, with dogs of three owners"""
+        for index in range(10):
+            Dog.create(name=f'Dog {index}', owner=('John', 'Jane', 'Carry')[index % 3],
+                       age=index % 4)
+        return repo_factory.get_repository(Dog)
+
+    @pytest.mark.parametrize('prefetch', [0, 2])
+    def test_pages_by_identifier(self, repository, prefetch):
+        """Test that all entities are returned once, in pages ordered by identifier"""
+        pages = list(repository.iter_pages(page_size=4, prefetch=prefetch))
+
+        assert [len(page) for page in pages] == [4, 4, 2]
+        identifiers = [dog.id for page in pages for dog in page]
+        assert identifiers == sorted(identifiers)
+        assert len(set(identifiers)) == 10
+        assert all(dog.state_.is_persisted for page in pages for dog in page)
+
+    def test_pages_with_criteria_and_ordering(self, repository):
+        """Test ordering pages by fields with duplicate values, in both directions"""
+        pages = list(repository.iter_pages(
+            Q(owner='John') | Q(owner='Jane'), page_size=2, order_by=['-age', 'name']))
+
+        dogs = [(dog.age, dog.name) for page in pages for dog in page]
+        assert len(dogs) == 7
+        assert dogs == sorted(dogs, key=lambda dog: (-dog[0], dog[1]))
+        assert all(len(page) == 2 for page in pages[:-1])
+
+    def test_exact_multiple_of_page_size(self, repository):
+        """Test that no empty page is returned when the last page is full"""
+        pages = list(repository.iter_pages(page_size=5))
+        assert [len(page) for page in pages] == [5, 5]
+
+        assert list(repository.iter_pages(Q(owner='Nobody'))) == []
+
+    def test_writes_between_pages(self, repository):
+        """Test that entities deleted before their page is fetched are skipped, without
+        shifting later pages"""
+        pages = repository.iter_pages(page_size=3, prefetch=0)
+        first = next(pages)
+        Dog.query.filter(name='Dog 0').delete_all()
+        Dog.query.filter(name='Dog 5').delete_all()
+
+        rest = [dog.name for page in pages for dog in page]
+        assert len(first) == 3
+        assert 'Dog 5' not in rest
+        assert len(rest) == 6
+
+    def test_pages_within_transaction(self, repository):
+        """Test that pages within a transaction see its uncommitted writes"""
+        with providers.get_provider().transaction():
+            Dog.create(name='Dog 10', owner='John')
+            pages = list(repo_factory.get_repository(Dog).iter_pages(page_size=4))
+
+        assert sum(len(page) for page in pages) == 11
+
+    def test_invalid_ordering(self, repository):
+        """Test that pages cannot be ordered by search relevance"""
+        with pytest.raises(ValueError):
+            list(repository.iter_pages(order_by=['-search_rank']))
+
+
+class TestPrefetching:
+    """Class to test reading items ahead on a background thread"""
+
+    def test_depth_bounded(self):
+        """Test that the background thread stays at most `depth` items ahead"""
+        produced = []
+
+        def items():
+            for index in range(10):
+                produced.append(index)
+                yield index
+
+        iterator = prefetched(items(), 2)
+        assert next(iterator) == 0
+
+        # One item consumed, two queued, and one waiting to be queued
+        time.sleep(0.3)
+        assert len(produced) <= 4
+        assert list(iterator) == list(range(1, 10))
+
+    def test_errors_raised_in_order(self):
+        """Test that errors of the iterable are raised after the items before them"""
+        def items():
+            yield 1
+            raise RuntimeError('Lost connection')
+
+        iterator = prefetched(items(), 2)
+        assert next(iterator) == 1
+        with pytest.raises(RuntimeError):
+            next(iterator)
+
+    def test_closing_stops_thread(self):
+        """Test that closing the iterator stops the background thread"""
+        def items():
+            index = 0
+            while True:
+                yield index
+                index += 1
+
+        iterator = prefetched(items(), 1)
+        next(iterator)
+        iterator.close()
+
+        assert not any(
+            thread.name == 'protean-sqlalchemy-prefetch' and thread.is_alive()
+            for thread in threading.enumerate())
@@ -0,0 +1,116 @@
+"""Module to test time-partitioned tables"""
+from datetime import date
+from datetime import datetime
+
+import pytest
+from protean.core.exceptions import ConfigurationError
+from protean.core.repository import repo_factory
+from sqlalchemy import MetaData
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateTable
+
+from protean_sqlalchemy.partition import partition_name
+from protean_sqlalchemy.partition import partition_start
+from protean_sqlalchemy.partition import period_end
+from protean_sqlalchemy.partition import period_start
+from protean_sqlalchemy.repository import SqlalchemyModel
+
+from .support.audit import AuditLog
+from .support.dog import Dog
+
+
+class TestPartitions:
+    """Class to test partitioning entities by a date field"""
+
+    def test_periods(self):
+        """Test computing the periods held by partitions"""
+        value = datetime(2019, 12, 17, 10, 30)
+
+        assert period_start(value, 'day') == date(2019, 12, 17)
+        assert period_start(value, 'month') == date(2019, 12, 1)
+        assert period_start(value, 'year') == date(2019, 1, 1)
+
+        assert period_end(date(2019, 12, 31), 'day') == date(2020, 1, 1)
+        assert period_end(date(2019, 12, 1), 'month') == date(2020, 1, 1)
+        assert period_end(date(2019, 1, 1), 'year') == date(2020, 1, 1)
+
+        name = partition_name('audit_log', date(2019, 12, 1), 'month')
+        assert name == 'audit_log_p201912'
+        assert partition_start('audit_log', name, 'month') == date(2019, 12, 1)
+        assert partition_start('audit_log', 'audit_log_archive', 'month') is None
+
+    def test_native_partitions_on_postgres(self):
+        """Test that the table is partitioned by range of the partition field on Postgres"""
+        engine = create_engine('postgresql://', strategy='mock', executor=lambda *args: None)
+        model_cls = type('PostgresAuditLogModel', (SqlalchemyModel, ), {
+            'entity_cls': AuditLog,
+            'metadata': MetaData(bind=engine)})
+
+        ddl = str(CreateTable(model_cls.__table__).compile(dialect=postgresql.dialect()))
+        assert 'id SERIAL' in ddl
+        assert 'UNIQUE' not in ddl
+        assert 'PRIMARY KEY (id, created_at)' in ddl
+        assert ddl.strip().endswith('PARTITION BY RANGE (created_at)')
+
+    def test_indexed_table_without_native_partitions(self, provider):
+        """Test that the partition field is indexed on databases without native partitions"""
+        table = repo_factory.get_model(AuditLog).__table__
+
+        assert [column.name for column in table.primary_key] == ['id']
+        assert [index.columns.keys() for index in table.indexes] == [['created_at']]
+        assert provider.create_partition(AuditLog, datetime(2019, 1, 1)) is None
+
+    def test_drop_partitions(self, provider):
+        """Test that retention removes the data of expired periods"""
+        AuditLog.create(message='Old', created_at=datetime(2019, 1, 31, 23, 59))
+        AuditLog.create(message='Recent', created_at=datetime(2019, 2, 1))
+        AuditLog.create(message='Current', created_at=datetime(2019, 3, 15))
+
+        provider.drop_partitions(AuditLog, before=datetime(2019, 2, 10))
+
+        logs = AuditLog.query.filter(created_at__gte=datetime(2019, 1, 1)).all()
+        assert [log.message for log in logs] == ['Recent', 'Current']
+
+    def test_unpartitioned_entity(self, provider):
+        """Test that retention by partitions is only available to partitioned entities"""
+        with pytest.raises(ConfigurationError):
+            provider.drop_partitions(Dog, before=datetime(2019, 1, 1))
+
+    def test_partitions_in_transaction_not_remembered(self, provider, monkeypatch):
+        """Test that partitions created on a connection are left to the caller to remember,
+        and are created once per transaction"""
+        statements = []
+
+        class Connection:
+            def execute(self, statement):
+                statements.append(statement)
+
+        monkeypatch.setattr(provider._engine.dialect, 'name', 'postgresql')
+        monkeypatch.setattr(provider, '_partitions', set())
+        pending = set()
+        for day in (1, 15):
+            name = provider.create_partition(
+                AuditLog, datetime(2019, 1, day), Connection(), pending)
+
+        assert name == 'audit_log_p201901'
+        assert len(statements) == 1
+        assert pending == {name}
+        assert provider._partitions == set()
+
+    def test_partitions_remembered_on_commit(self, provider, monkeypatch):
+        """Test that partitions created by repositories are remembered only once committed"""
+        monkeypatch.setattr(provider, '_partitions', set())
+        monkeypatch.setattr(
+            provider, 'create_partition', lambda entity_cls, value, conn: 'audit_log_p201901')
+
+        with pytest.raises(ValueError):
+            with provider.transaction():
+                AuditLog.create(message='Rolled back', created_at=datetime(2019, 1, 15))
+                raise ValueError('Abort')
+        assert provider._partitions == set()
+
+        with provider.transaction():
+            AuditLog.create(message='Committed', created_at=datetime(2019, 1, 15))
+            assert provider._partitions == set()
+        assert provider._partitions == {'audit_log_p201901'}
@@ -0,0 +1,44 @@
+"""Module to test memory profiling of repository calls"""
+from protean_sqlalchemy.profiling import MemoryProfiler
+from protean_sqlalchemy.profiling import memory_benchmark
+
+from .support.dog import Dog
+
+
+class TestMemoryProfiling:
+    """Class to test the memory profiler of the provider"""
+
+    def test_profile_repository_calls(self, provider):
+        """Test that calls are profiled by entity and method within the block"""
+        with provider.profile_memory() as profiler:
+            for index in range(20):
+                Dog.create(name=f'Dog {index}', owner='John', age=index)
+            dogs = Dog.query.filter(owner='John').limit(20).all()
+            assert dogs.total == 20
+
+        stats = {(item.entity_name, item.method): item for item in profiler.report()}
+        assert stats[('Dog', 'create')].calls == 20
+        assert stats[('Dog', 'filter')].peak > 0
+        assert provider.memory_profiler is None
+
+        # Calls outside the block are not profiled
+        Dog.query.filter(owner='John').all()
+        assert sum(item.calls for item in profiler.report()) == \
+            sum(item.calls for item in stats.values())
+
+    def test_nested_calls_attributed_to_outer_call(self):
+        """Test that a profiled call made within another is not recorded separately"""
+        profiler = MemoryProfiler()
+        with profiler:
+            profiler.call('Dog', 'outer', profiler.call, 'Dog', 'inner', list, range(1000))
+
+        assert [(stats.method, stats.calls) for stats in profiler.report()] == [('outer', 1)]
+
+    def test_memory_benchmark(self):
+        """Test that the benchmark reports each stage and leaves the table empty"""
+        report = memory_benchmark(
+            Dog, lambda index: {'name': f'Dog {index}', 'owner': 'John', 'age': 10}, count=10)
+
+        methods = {stats.method for stats in report}
+        assert {'create', 'filter', 'delete_all'} <= methods
+        assert Dog.query.all().total == 0
@@ -1,7 +1,12 @@
 """Module to test Provider Class"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+import pytest
 from protean.conf import active_config
+from protean.core.exceptions import ConfigurationError
 from sqlalchemy.engine import ResultProxy
 
 from protean_sqlalchemy.provider import SAProvider
@@ -11,6 +16,14 @@ from .support.dog import RelatedDog
 from .support.human import RelatedHuman
 
 
+def count_dogs_in_worker():
+    """Count dogs from a worker process, reporting the process owning the provider's pool"""
+    from protean.core.provider import providers
+
+    total = Dog.query.filter(owner='John').total
+    return os.getpid(), providers.get_provider()._pid, total
+
+
 class TestSAProvider:
     """Class to test Connection Handler class"""
 
@@ -34,6 +47,77 @@ class TestSAProvider:
         resp = conn.execute(
             'SELECT * FROM sqlite_master WHERE type="table"')
         assert len(list(resp)) > 1
+        conn.close()
+
+    def test_sqlite_profile(self, tmpdir):
+        """Test that the SQLite pragma profile is applied on each connection"""
+        provider = SAProvider({
+            'DATABASE_URI': f'sqlite:///{tmpdir.join("fast.db")}',
+            'SQLITE_PROFILE': 'fast',
+            'SQLITE_PRAGMAS': {'cache_size': -2000}})
+        conn = provider.get_connection()
+
+        assert conn.execute('PRAGMA journal_mode').scalar() == 'wal'
+        assert conn.execute('PRAGMA synchronous').scalar() == 1
+        assert conn.execute('PRAGMA temp_store').scalar() == 2
+        assert conn.execute('PRAGMA cache_size').scalar() == -2000
+
+    def test_invalid_sqlite_profile(self):
+        """Test that unknown profiles and malformed pragmas are rejected"""
+        with pytest.raises(ConfigurationError):
+            SAProvider({'DATABASE_URI': 'sqlite://', 'SQLITE_PROFILE': 'turbo'})
+
+        with pytest.raises(ConfigurationError):
+            SAProvider({'DATABASE_URI': 'sqlite://',
+                        'SQLITE_PRAGMAS': {'cache_size': '1; DROP TABLE dog'}})
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='Requires the fork start method')
+    def test_forked_workers(self):
+        """Test that forked workers use their own connection pool"""
+        from protean.core.provider import providers
+
+        Dog.create(name='Cash', owner='John', age=10)
+        Dog.create(name='Gooey', owner='John', age=2)
+
+        provider = providers.get_provider()
+        parent_pool = provider._engine.pool
+
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=2, mp_context=context) as executor:
+            results = [executor.submit(count_dogs_in_worker).result() for _ in range(4)]
+
+        for worker_pid, provider_pid, total in results:
+            assert worker_pid != os.getpid()
+            assert provider_pid == worker_pid
+            assert total == 2
+
+        # The parent process continues to use its own pool
+        assert provider._engine.pool is parent_pool
+        assert Dog.query.filter(owner='John').total == 2
+
+    def test_pooled_connection_from_parent_is_replaced(self, monkeypatch, tmpdir):
+        """Test that connections opened by another process are never checked out"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import QueuePool
+
+        # SQLite databases are not pooled by default, so pool connections to a file database
+        monkeypatch.setattr(
+            'sqlalchemy.create_engine', lambda url: create_engine(url, poolclass=QueuePool))
+        provider = SAProvider({'DATABASE_URI': f'sqlite:///{tmpdir.join("pooled.db")}'})
+        connection = provider._engine.connect()
+        dbapi_connection = connection.connection.connection
+        connection.close()
+
+        # Connections are reused within the process
+        connection = provider._engine.connect()
+        assert connection.connection.connection is dbapi_connection
+        connection.close()
+
+        # Pretend to be a child process that inherited the pooled connection
+        monkeypatch.setattr(os, 'getpid', lambda: provider._pid + 1)
+        connection = provider._engine.connect()
+        assert connection.connection.connection is not dbapi_connection
+        assert connection.scalar('SELECT 1') == 1
 
     def test_raw(self):
         """Test raw queries on Provider"""
@@ -27,7 +27,11 @@ class TestRelations:
     @pytest.fixture(scope='function', autouse=True)
     def conn(self, default_provider):
         """Construct dummy Human objects for queries"""
-        return default_provider.get_connection()
+        conn = default_provider.get_connection()
+        yield conn
+
+        # Reads begin a transaction on SQLite too, which would lock out the truncation
+        conn.close()
 
     def test_create_related(self, related_humans):
         """Test Cceating an entity with a related field"""
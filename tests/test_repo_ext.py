@@ -46,3 +46,15 @@ class TestSqlalchemyRepositoryExt:
 
         dogs = Dog.query.filter().all()
         assert dogs is not None
+
+    def test_update_list_modified_in_place(self):
+        """ Test that lists modified in place are detected as changed on update"""
+        Human.create(name='John Doe', date_of_birth='01-01-2000', hobbies=['swimming'])
+
+        human = Human.get(1)
+        human.hobbies.append('running')
+        human.update(age=31)
+
+        human = Human.get(1)
+        assert human.hobbies == ['swimming', 'running']
+        assert human.age == 31
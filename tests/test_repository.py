@@ -1,8 +1,12 @@
 """Module to test Repository Classes and Functionality"""
 import pytest
 from protean.core.exceptions import ValidationError
+from protean.impl.cache.local_mem import LocalMemCache
+from protean.utils.query import Q
+from sqlalchemy import event
 
 from .support.dog import Dog
+from .support.ticket import Ticket
 
 
 class TestSqlalchemyRepository:
@@ -17,7 +21,11 @@ class TestSqlalchemyRepository:
     @pytest.fixture(scope='function', autouse=True)
     def conn(self, default_provider):
         """Construct dummy Human objects for queries"""
-        return default_provider.get_connection()
+        conn = default_provider.get_connection()
+        yield conn
+
+        # Reads begin a transaction on SQLite too, which would lock out the truncation
+        conn.close()
 
     def test_create(self, conn, default_provider):
         """Test creating an entity in the repository"""
@@ -59,6 +67,22 @@ class TestSqlalchemyRepository:
         assert dog_db.name == 'Johnny'
         assert dog.age == 7
 
+    def test_update_writes_changed_columns(self, conn, default_provider, statements):
+        """Test that updates write only the columns that have changed"""
+        dog = Dog.create(name='Johnny', owner='John')
+        dog.update(age=7)
+
+        dog = Dog.get(dog.id)
+        dog.update(owner='John', age=7)
+        dog.update(owner='Carry')
+
+        assert [statement for statement in statements if statement.startswith('UPDATE')] == [
+            'UPDATE dog SET age=? WHERE dog.id = ?',
+            'UPDATE dog SET owner=? WHERE dog.id = ?']
+
+        dog_db = conn.query(default_provider.get_model(Dog)).get(dog.id)
+        assert (dog_db.owner, dog_db.age) == ('Carry', 7)
+
     def test_filter(self):
         """Test reading entities from the repository"""
         Dog.create(name='Cash', owner='John', age=10)
@@ -82,6 +106,108 @@ class TestSqlalchemyRepository:
         dogs = Dog.query.filter(owner='John').exclude(name__in=['Cash', 'Gooey'])
         assert dogs.total == 0
 
+    def test_filter_with_offset(self):
+        """Test paging through entities with offset and limit"""
+        Dog.create(name='Cash', owner='John', age=10)
+        Dog.create(name='Boxy', owner='Carry', age=4)
+        Dog.create(name='Gooey', owner='John', age=2)
+
+        dogs = Dog.query.order_by('age').offset(1).limit(1).all()
+        assert [d.name for d in dogs.items] == ['Boxy']
+        assert dogs.total == 3
+        assert dogs.has_next is True
+
+    def test_read_only_filter(self, default_provider):
+        """Test filtering rows through the Core fast path"""
+        Dog.create(name='Cash', owner='John', age=10)
+        Dog.create(name='Boxy', owner='Carry', age=4)
+        Dog.create(name='Gooey', owner='John', age=2)
+
+        repository = default_provider.get_repository(Dog)
+        model_cls = default_provider.get_model(Dog)
+        results = repository.filter(Q(owner='John'), offset=1, limit=1,
+                                    order_by=['-age'], read_only=True)
+
+        assert results.total == 2
+        assert not isinstance(results.first, model_cls)
+        assert len(repository.conn.identity_map) == 0
+
+        dog = model_cls.to_entity(results.first)
+        assert (dog.id, dog.name, dog.owner, dog.age) == (3, 'Gooey', 'John', 2)
+
+    def test_get_many(self, default_provider, monkeypatch):
+        """Test fetching entities by identifiers, in the order requested"""
+        Dog.create(name='Cash', owner='John', age=10)
+        Dog.create(name='Boxy', owner='Carry', age=4)
+        Dog.create(name='Gooey', owner='John', age=2)
+
+        repository = default_provider.get_repository(Dog)
+        monkeypatch.setattr(repository, 'get_many_chunk_size', 2)
+
+        dogs = repository.get_many([3, 99, 1, 3, 2])
+        assert [dog and dog.name for dog in dogs] == ['Gooey', None, 'Cash', 'Gooey', 'Boxy']
+        assert dogs[0].state_.is_persisted is True
+        assert repository.get_many([]) == []
+
+    def test_get_many_converts_identifiers(self, default_provider):
+        """Test that identifiers are matched to records once converted to the identifier's type"""
+        Dog.create(name='Cash', owner='John', age=10)
+        ticket = Ticket.create(title='Broken')
+
+        dogs = default_provider.get_repository(Dog).get_many(['1', 1])
+        assert [dog and dog.name for dog in dogs] == ['Cash', 'Cash']
+        tickets = default_provider.get_repository(Ticket).get_many([ticket.id.upper()])
+        assert tickets[0].id == ticket.id
+
+    def test_get_many_from_cache(self, default_provider, monkeypatch, statements):
+        """Test that records are served from the provider's cache until they change"""
+        monkeypatch.setattr(default_provider, 'cache', LocalMemCache({'LOCATION': 'get_many'}))
+        default_provider.cache.clear()
+
+        Dog.create(name='Cash', owner='John', age=10)
+        dog = Dog.create(name='Boxy', owner='Carry', age=4)
+        statements.clear()
+
+        try:
+            repository = default_provider.get_repository(Dog)
+            assert [d.name for d in repository.get_many([1, 2])] == ['Cash', 'Boxy']
+            assert [d.name for d in repository.get_many([2, 1])] == ['Boxy', 'Cash']
+            assert len(statements) == 1
+
+            # Changed records are evicted from the cache
+            dog.update(age=5)
+            Dog.query.filter(owner='John').update_all(age=11)
+            assert [d.age for d in repository.get_many([1, 2])] == [11, 5]
+
+            Dog.query.filter(owner='John').delete_all()
+            assert repository.get_many([1]) == [None]
+        finally:
+            default_provider.cache.clear()
+
+    def test_get_many_cache_in_transaction(self, default_provider, monkeypatch):
+        """Test that uncommitted records are not cached, and that records written in a
+        transaction are evicted again when it commits"""
+        monkeypatch.setattr(default_provider, 'cache', LocalMemCache({'LOCATION': 'get_many'}))
+        default_provider.cache.clear()
+        repository = default_provider.get_repository(Dog)
+
+        dog = Dog.create(name='Cash', owner='John', age=10)
+        with pytest.raises(ValueError):
+            with default_provider.transaction():
+                dog.update(name='Uncommitted')
+                assert default_provider.get_repository(Dog).get_many([dog.id])[0].name == \
+                    'Uncommitted'
+                raise ValueError('Abort')
+        assert repository.get_many([dog.id])[0].name == 'Cash'
+
+        with default_provider.transaction():
+            dog.update(age=5)
+
+            # Another session caches the record as last committed, before the commit
+            assert repository.get_many([dog.id])[0].age == 10
+        assert repository.get_many([dog.id])[0].age == 5
+        default_provider.cache.clear()
+
     def test_delete(self, conn, default_provider):
         """Test deleting an entity from the repository"""
         # Delete the entity and validate the results
@@ -122,6 +248,72 @@ class TestSqlalchemyRepository:
         remaining_dogs = Dog.query.all()
         assert remaining_dogs.total == 1
 
+    def test_update_all_in_batches(self, default_provider):
+        """Test updating matching records in batches, with a commit per batch"""
+        from protean.core.repository import repo_factory
+
+        for index in range(7):
+            Dog.create(name=f'Dog {index}', owner='John' if index != 3 else 'Carry', age=index)
+
+        commits, progress = [], []
+
+        def record_commit(connection):
+            commits.append(connection)
+
+        event.listen(default_provider._engine, 'commit', record_commit)
+        try:
+            updated_count = repo_factory.get_repository(Dog).update_all(
+                Q(owner='John'), {'age': 9}, batch_size=2, progress=progress.append)
+        finally:
+            event.remove(default_provider._engine, 'commit', record_commit)
+
+        assert updated_count == 6
+        assert progress == [2, 4, 6]
+        assert len(commits) == 3
+        assert Dog.query.filter(age=9).total == 6
+        assert Dog.query.filter(owner='Carry').first.age == 3
+
+    def test_update_all_value_named_like_option(self, default_provider, monkeypatch):
+        """Test that keyword arguments naming fields of the entity are values to update, even
+        when they are named like options of `update_all`"""
+        from protean.core.repository import repo_factory
+
+        monkeypatch.setitem(default_provider.conn_info, 'BULK_BATCH_SIZE', 1)
+        tickets = [Ticket.create(title='Broken') for _ in range(2)]
+
+        updated_count = Ticket.query.filter(title='Broken').update_all(progress=50)
+        assert updated_count == 2
+        assert [Ticket.get(ticket.id).progress for ticket in tickets] == [50, 50]
+
+        repository = repo_factory.get_repository(Ticket)
+        assert repository.update_all(Q(title='Broken'), progress=None, timeout=5) == 2
+        assert [Ticket.get(ticket.id).progress for ticket in tickets] == [None, None]
+
+    def test_delete_all_in_batches(self, default_provider, monkeypatch):
+        """Test deleting matching records in batches, throttled, and by default with the
+        provider's `BULK_BATCH_SIZE`"""
+        from protean.core.repository import repo_factory
+
+        for index in range(5):
+            Dog.create(name=f'Dog {index}', owner='John', age=index)
+        Dog.create(name='Boxy', owner='Carry', age=4)
+
+        sleeps = []
+        monkeypatch.setattr('time.sleep', sleeps.append)
+        monkeypatch.setitem(default_provider.conn_info, 'BULK_BATCH_SIZE', 2)
+        progress = []
+        deleted_count = repo_factory.get_repository(Dog).delete_all(
+            Q(owner='John'), throttle=0.5, progress=progress.append)
+
+        assert deleted_count == 5
+        assert progress == [2, 4, 5]
+        assert sleeps == [0.5, 0.5]
+        assert Dog.query.all().total == 1
+
+        # Queries forward no options, and use the provider's batch size
+        Dog.query.filter(owner='Carry').delete_all()
+        assert Dog.query.all().total == 0
+
     def test_raw(self):
         """Test raw queries on a Model in the repository"""
         # Update the entity and validate the results
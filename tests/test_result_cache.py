@@ -0,0 +1,157 @@
+"""Module to test caching of filter results"""
+import pytest
+from protean.core.provider import providers
+from protean.core.repository import repo_factory
+from protean.utils.query import Q
+
+from protean_sqlalchemy.loader import bulk_load
+from protean_sqlalchemy.provider import SAProvider
+from protean_sqlalchemy.result_cache import ResultCache
+
+from .support.dog import Dog
+
+
+class TestResultCache:
+    """Class to test the result cache of filters"""
+
+    @pytest.fixture(scope='function')
+    def cache(self):
+        """Cache filter results of the provider for the duration of a test"""
+        provider = providers.get_provider()
+        provider.result_cache = ResultCache()
+        yield provider.result_cache
+        provider.result_cache = None
+
+    def test_repeated_filter_served_from_cache(self, cache, statements):
+        """Test that identical filters query the database once"""
+        Dog.create(name='Johnny', owner='John', age=2)
+        Dog.create(name='Cash', owner='John', age=4)
+
+        dogs = Dog.query.filter(owner='John').order_by('age').all()
+        assert [dog.name for dog in dogs] == ['Johnny', 'Cash']
+        queried = len(statements)
+
+        dogs = Dog.query.filter(owner='John').order_by('age').all()
+        assert [dog.name for dog in dogs] == ['Johnny', 'Cash']
+        assert dogs.total == 2
+        assert dogs.first.id is not None
+        assert len(statements) == queried
+        assert cache.hits == 1
+
+        # Other criteria, and other pages, are queried separately
+        assert Dog.query.filter(owner='Jane').all().total == 0
+        assert Dog.query.filter(owner='John').offset(1).all().total == 2
+        assert cache.hits == 1
+
+    def test_read_only_filter_cached(self, cache):
+        """Test that filters bypassing the ORM are cached as well"""
+        Dog.create(name='Johnny', owner='John', age=2)
+        repository = repo_factory.get_repository(Dog)
+
+        repository.filter(Q(owner='John'), read_only=True)
+        result = repository.filter(Q(owner='John'), read_only=True)
+        assert result.items[0].name == 'Johnny'
+        assert cache.hits == 1
+
+    @pytest.mark.parametrize('write', [
+        lambda dog: Dog.create(name='Cash', owner='John'),
+        lambda dog: dog.update(age=7),
+        lambda dog: Dog.query.filter(owner='John').update_all(age=7),
+        lambda dog: dog.delete(),
+        lambda dog: Dog.query.filter(owner='John').delete_all(),
+        lambda dog: bulk_load(Dog, [{'name': 'Cash', 'owner': 'John'}], processes=1),
+    ])
+    def test_writes_invalidate_table(self, cache, write):
+        """Test that writes to a table drop the cached results of the table"""
+        dog = Dog.create(name='Johnny', owner='John', age=2)
+        before = [(item.name, item.age) for item in Dog.query.filter(owner='John').all()]
+        assert len(cache) == 1
+
+        write(dog)
+        assert len(cache) == 0
+
+        after = [(item.name, item.age) for item in Dog.query.filter(owner='John').all()]
+        assert after != before
+
+    def test_transaction_bypasses_cache(self, cache):
+        """Test that results within a transaction are not cached, and that the table is
+        invalidated when the transaction commits"""
+        provider = providers.get_provider()
+        Dog.create(name='Johnny', owner='John', age=2)
+        assert Dog.query.filter(owner='John').all().total == 1
+
+        with provider.transaction():
+            Dog.create(name='Cash', owner='John', age=4)
+            assert Dog.query.filter(owner='John').all().total == 2
+            assert Dog.query.filter(owner='John').all().total == 2
+            assert cache.hits == 0
+            assert len(cache) == 0
+
+            # Results cached by other threads before the commit are dropped when it commits
+            cache.set('dog', 'stale', [], cache.version('dog'))
+
+        assert len(cache) == 0
+        assert Dog.query.filter(owner='John').all().total == 2
+
+    def test_cached_results_are_copies(self, cache):
+        """Test that changes to returned entities do not change cached results"""
+        Dog.create(name='Johnny', owner='John', age=2)
+        Dog.query.filter(owner='John').all().first.age = 10
+
+        assert Dog.query.filter(owner='John').all().first.age == 2
+        assert cache.hits == 1
+
+
+class TestResultCacheEviction:
+    """Class to test bounds and invalidation hooks of the result cache"""
+
+    def test_least_recently_used_evicted(self):
+        """Test that results are evicted least recently used first, once the cache is full"""
+        cache = ResultCache(max_size=2500)
+        version = cache.version('dog')
+        cache.set('dog', 'a', 'a' * 1000, version)
+        cache.set('dog', 'b', 'b' * 1000, version)
+        assert cache.get('a') == 'a' * 1000
+
+        cache.set('dog', 'c', 'c' * 1000, version)
+        assert cache.get('b') is None
+        assert cache.get('a') is not None
+        assert cache.get('c') is not None
+        assert cache.size <= 2500
+
+        # Results larger than the cache are never stored
+        cache.set('dog', 'd', 'd' * 3000, version)
+        assert cache.get('d') is None
+
+    def test_stale_results_not_stored(self):
+        """Test that results read before an invalidation are discarded"""
+        cache = ResultCache()
+        version = cache.version('dog')
+        cache.invalidate('dog')
+        cache.set('dog', 'a', [1], version)
+        assert cache.get('a') is None
+
+        version = cache.version('dog')
+        cache.clear()
+        cache.set('dog', 'a', [1], version)
+        assert cache.get('a') is None
+
+    def test_invalidation_hooks(self):
+        """Test that local invalidations are propagated to hooks, and remote ones are not"""
+        cache = ResultCache()
+        invalidated = []
+        cache.on_invalidate(invalidated.append)
+
+        cache.set('dog', 'a', [1], cache.version('dog'))
+        cache.set('human', 'b', [2], cache.version('human'))
+        cache.invalidate('dog')
+        cache.invalidate('human', propagate=False)
+
+        assert invalidated == ['dog']
+        assert len(cache) == 0
+
+    def test_configured_cache(self):
+        """Test that the result cache is configured with the `RESULT_CACHE` key"""
+        provider = SAProvider({'DATABASE_URI': 'sqlite://', 'RESULT_CACHE': {'MAX_SIZE': 1024}})
+        assert provider.result_cache.max_size == 1024
+        assert SAProvider({'DATABASE_URI': 'sqlite://'}).result_cache is None
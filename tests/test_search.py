@@ -0,0 +1,90 @@
+"""Module to test full-text search lookups"""
+import pytest
+from protean.core.exceptions import ConfigurationError
+from sqlalchemy import MetaData
+from sqlalchemy import create_engine
+
+from protean_sqlalchemy.repository import SqlalchemyModel
+from protean_sqlalchemy.search import fts5_query
+
+from .support.dog import Dog
+from .support.note import Note
+
+
+class TestSearch:
+    """Class to test the `search` lookup and ordering by relevance"""
+
+    @pytest.fixture(scope='function')
+    def notes(self):
+        """Create notes to search"""
+        return [
+            Note.create(title='Quick fox', body='The quick brown fox jumps', author='John'),
+            Note.create(title='Lazy dog', body='A lazy dog sleeps all day', author='Jane'),
+            Note.create(title='Fox and dog', body='The fox and the dog', author='John'),
+        ]
+
+    def test_search(self, notes):
+        """Test that notes containing all words of the text are found"""
+        found = Note.query.filter(body__search='fox').order_by('id').all()
+        assert [note.title for note in found] == ['Quick fox', 'Fox and dog']
+
+        found = Note.query.filter(body__search='dog fox').all()
+        assert [note.title for note in found] == ['Fox and dog']
+
+        # Search and other lookups can be combined
+        found = Note.query.filter(title__search='dog', author='Jane').all()
+        assert [note.title for note in found] == ['Lazy dog']
+
+    def test_index_follows_writes(self, notes):
+        """Test that updates and deletes are reflected in search results"""
+        notes[0].update(body='A quick brown cat')
+        notes[2].delete()
+
+        assert Note.query.filter(body__search='fox').all().total == 1
+        assert Note.query.filter(body__search='cat').all().total == 1
+
+    def test_order_by_rank(self, notes):
+        """Test that results can be listed from the most relevant"""
+        Note.create(title='Foxes', body='fox fox fox fox', author='Jane')
+
+        found = Note.query.filter(body__search='fox').order_by('-search_rank').all()
+        assert found.first.title == 'Foxes'
+        assert found.total == 3
+
+    def test_search_text_quoted(self, notes):
+        """Test that operators and punctuation in the text are not interpreted"""
+        assert fts5_query('fox OR "dog"') == '"fox" "OR" """dog"""'
+        assert Note.query.filter(body__search='fox OR cat').all().total == 0
+
+    def test_search_on_unindexed_field(self, notes):
+        """Test that searching fields without a full-text index is rejected"""
+        with pytest.raises(ConfigurationError):
+            Note.query.filter(author__search='John').all()
+
+        with pytest.raises(ConfigurationError):
+            Dog.query.filter(name__search='Cash').all()
+
+    def test_rank_without_search(self, notes):
+        """Test that ordering by relevance requires a search"""
+        with pytest.raises(ValueError):
+            Note.query.filter(author='John').order_by('-search_rank').all()
+
+    def test_postgres_index(self):
+        """Test that a generated tsvector column and GIN index are created on Postgres"""
+        statements = []
+        engine = create_engine(
+            'postgresql://', strategy='mock',
+            executor=lambda sql, *args, **kwargs: statements.append(
+                str(sql.compile(dialect=engine.dialect))))
+        metadata = MetaData(bind=engine)
+        model_cls = type('PostgresNoteModel', (SqlalchemyModel, ), {
+            'entity_cls': Note,
+            'metadata': metadata})
+        metadata.create_all(engine, tables=[model_cls.__table__])
+
+        assert statements[1] == (
+            'ALTER TABLE "note" ADD COLUMN search_vector tsvector GENERATED ALWAYS AS '
+            '(to_tsvector(\'english\', coalesce("title", \'\') || \' \' || '
+            'coalesce("body", \'\'))) STORED')
+        assert statements[2] == 'CREATE INDEX "note_search_idx" ON "note" USING GIN (search_vector)'
+        assert not any('fts5' in statement for statement in statements)
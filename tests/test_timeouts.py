@@ -0,0 +1,48 @@
+"""Module to test statement timeouts on repository queries"""
+import pytest
+from protean.utils.query import Q
+
+from protean_sqlalchemy.timeout import StatementTimeoutError
+
+from .support.dog import Dog
+
+# A query on the dog table that takes several seconds to run on SQLite
+SLOW_QUERY = (
+    'WITH RECURSIVE counter(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM counter) '
+    'SELECT * FROM dog WHERE (SELECT count(*) FROM (SELECT x FROM counter LIMIT 100000000)) > 0')
+
+
+class TestStatementTimeouts:
+    """Class to test cancelling queries that exceed their time budget"""
+
+    @pytest.fixture(scope='function', autouse=True)
+    def dogs(self):
+        """Create sample dogs in database"""
+        Dog.create(name='Cash', owner='John', age=10)
+        Dog.create(name='Boxy', owner='Carry', age=4)
+
+    def test_raw_timeout(self, provider):
+        """Test that a slow raw query is cancelled"""
+        repository = provider.get_repository(Dog)
+        with pytest.raises(StatementTimeoutError):
+            repository.raw(SLOW_QUERY, timeout=0.05)
+
+        # The repository remains usable after a timeout
+        assert repository.filter(Q(owner='John')).total == 1
+
+    def test_default_timeout(self, provider, monkeypatch):
+        """Test that the default timeout is read from the connection info"""
+        monkeypatch.setitem(provider.conn_info, 'STATEMENT_TIMEOUT', 0.05)
+        with pytest.raises(StatementTimeoutError):
+            provider.get_repository(Dog).raw(SLOW_QUERY)
+
+    def test_queries_within_budget(self, provider):
+        """Test that queries completing within their budget are unaffected"""
+        repository = provider.get_repository(Dog)
+
+        assert repository.filter(Q(owner='John'), timeout=5).total == 1
+        assert repository.filter(Q(owner='John'), timeout=5, read_only=True).total == 1
+        assert repository.update_all(Q(owner='John'), {'age': 3}, timeout=5) == 1
+        assert repository.delete_all(Q(owner='Carry'), timeout=5) == 1
+        assert Dog.query.filter(age=3).update_all(age=4, timeout=5) == 1
+        assert Dog.query.all().first.age == 4
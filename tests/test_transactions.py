@@ -0,0 +1,104 @@
+"""Module to test Unit of Work transactions on the Provider"""
+import pytest
+
+from .support.dog import Dog
+
+
+class TestTransactions:
+    """Class to test transactions spanning multiple repository calls"""
+
+    def count_dogs(self, provider):
+        """Count dogs over a connection outside the transaction's session"""
+        return provider._engine.execute('SELECT count(*) FROM dog').scalar()
+
+    def test_commit_at_end_of_block(self, provider):
+        """Test that writes are committed once, when the block exits"""
+        with provider.transaction():
+            Dog.create(name='Cash', owner='John', age=10)
+            dog = Dog.create(name='Boxy', owner='Carry', age=4)
+            dog.update(age=5)
+
+            # Writes are visible within the transaction, but not outside it
+            assert Dog.query.filter(owner='Carry').first.age == 5
+            assert self.count_dogs(provider) == 0
+
+        assert self.count_dogs(provider) == 2
+        assert Dog.get(dog.id).age == 5
+
+    def test_rollback_on_error(self, provider):
+        """Test that all writes in the block are rolled back together"""
+        with pytest.raises(ValueError):
+            with provider.transaction():
+                Dog.create(name='Cash', owner='John', age=10)
+                Dog.create(name='Boxy', owner='Carry', age=4)
+                raise ValueError('Abort')
+
+        assert self.count_dogs(provider) == 0
+
+    def test_nested_transaction_rolls_back_to_savepoint(self, provider):
+        """Test that a failing nested block only discards its own writes"""
+        with provider.transaction():
+            Dog.create(name='Cash', owner='John', age=10)
+
+            with pytest.raises(ValueError):
+                with provider.transaction():
+                    Dog.create(name='Boxy', owner='Carry', age=4)
+                    raise ValueError('Abort')
+
+            with provider.transaction():
+                Dog.create(name='Gooey', owner='John', age=2)
+
+        dogs = Dog.query.order_by('name').all()
+        assert [dog.name for dog in dogs] == ['Cash', 'Gooey']
+
+    def test_outer_rollback_after_nested_block(self, provider):
+        """Test that writes of a nested block that begins the transaction are rolled back with
+        the outer block"""
+        with pytest.raises(ValueError):
+            with provider.transaction():
+                with provider.transaction():
+                    Dog.create(name='Cash', owner='John', age=10)
+                raise ValueError('Abort')
+
+        assert self.count_dogs(provider) == 0
+
+    def test_bulk_operations_in_transaction(self, provider):
+        """Test that update_all and delete_all participate in the transaction"""
+        Dog.create(name='Cash', owner='John', age=10)
+        Dog.create(name='Boxy', owner='Carry', age=4)
+
+        with pytest.raises(ValueError):
+            with provider.transaction():
+                Dog.query.filter(owner='John').update_all(age=9)
+                Dog.query.filter(owner='Carry').delete_all()
+                raise ValueError('Abort')
+
+        assert self.count_dogs(provider) == 2
+        assert Dog.query.filter(age=9).total == 0
+
+    def test_retry_after_rollback(self, provider):
+        """Test that updates rolled back are written again when retried"""
+        dog = Dog.create(name='Boxy', owner='Carry', age=5)
+
+        with pytest.raises(ValueError):
+            with provider.transaction():
+                dog.update(age=7)
+                raise ValueError('Abort')
+        assert Dog.get(dog.id).age == 5
+
+        dog.update(age=7)
+        assert Dog.get(dog.id).age == 7
+
+    def test_retry_after_savepoint_rollback(self, provider):
+        """Test that updates rolled back to a savepoint are written again within the
+        transaction"""
+        dog = Dog.create(name='Boxy', owner='Carry', age=5)
+
+        with provider.transaction():
+            with pytest.raises(ValueError):
+                with provider.transaction():
+                    dog.update(age=7)
+                    raise ValueError('Abort')
+            dog.update(age=7)
+
+        assert Dog.get(dog.id).age == 7